@@ -1,21 +1,46 @@
-# app.py
 import gradio as gr
 import logging
-import yaml
+from app_config import get_config
 
-from backend import process_resume
+from backend import stream_resume_async
+from metrics import start_metrics_server
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Load configuration
-with open('config.yaml', 'r') as f:
-    config = yaml.safe_load(f)
+config = get_config()
 
-def process_resume_ui(cv_file_path, temperature, max_tokens):
+ui_config = config.get('ui', {}) or {}
+
+def render_progress(processing_message, cv_summary, repo_summaries, evaluation, breakdown):
+    """
+    Render the markdown shown while a screening is in progress.
+    """
+    report = f"{processing_message}\n\n"
+    if cv_summary is None:
+        return report + "_Reading the CV..._\n"
+    report += f"## **Candidate Summary:**\n{cv_summary}\n\n"
+
+    report += "## **GitHub Repository Analysis:**\n"
+    for repo in repo_summaries:
+        report += f"- **Repository Name:** [{repo['repo_name']}]({repo['repo_url']})\n"
+        report += f"  **Summary:**\n{repo['summary']}\n\n"
+    if evaluation is None:
+        return report + "_Analyzing GitHub repositories..._\n"
+    if not repo_summaries:
+        report += "No GitHub repositories found or analyzed.\n\n"
+
+    report += f"## **Candidate Evaluation:**\n{evaluation}\n"
+    if breakdown:
+        report += f"\n## **Timing Breakdown:**\n{breakdown}\n"
+    return report
+
+async def process_resume_ui(cv_file_path, temperature, max_tokens):
     if not cv_file_path:
-        return "Please upload a CV PDF file."
+        yield "Please upload a CV PDF file."
+        return
 
     # Prepare API parameters
     api_params = {
@@ -26,10 +51,27 @@ def process_resume_ui(cv_file_path, temperature, max_tokens):
 
     # Notify the user about processing time
     processing_message = "Processing the resume and analyzing all GitHub repositories. This may take several minutes depending on the number of repositories and their sizes."
+    cv_summary = None
+    repo_summaries = []
+    evaluation = None
+    breakdown = None
+    yield render_progress(processing_message, cv_summary, repo_summaries, evaluation, breakdown)
 
-    # Process the resume
-    report = process_resume(cv_file_path, api_params)
-    return f"{processing_message}\n\n{report}"
+    # Process the resume, updating the output as each stage finishes
+    async for event, data in stream_resume_async(cv_file_path, api_params):
+        if event == 'error':
+            yield data
+            return
+        if event == 'cv':
+            cv_summary = data['cv_summary']
+        elif event == 'repo':
+            repo_summaries.append(data)
+        elif event == 'evaluation':
+            evaluation = data
+            processing_message = "Processing complete."
+        elif event == 'breakdown':
+            breakdown = data
+        yield render_progress(processing_message, cv_summary, repo_summaries, evaluation, breakdown)
 
 iface = gr.Interface(
     fn=process_resume_ui,
@@ -44,5 +86,14 @@ iface = gr.Interface(
     allow_flagging="never"
 )
 
+# Queue requests so several screenings run side by side without blocking each other
+iface.queue(
+    default_concurrency_limit=ui_config.get('concurrency_limit', 4),
+    max_size=ui_config.get('max_queue_size', 32)
+)
+
 if __name__ == "__main__":
+    metrics_port = config.get('metrics', {}).get('port')
+    if metrics_port:
+        start_metrics_server(metrics_port)
     iface.launch(debug=True, share=True)
@@ -0,0 +1,71 @@
+"""
+Single, cached loader for config.yaml.
+
+The file is looked up, in order, from set_config_path() (used by the CLIs'
+--config option), the RESUME_SCREENER_CONFIG environment variable, and the
+config.yaml next to this module, so the application works from any working
+directory. Individual values can be overridden with environment variables of
+the form RESUME_SCREENER__<SECTION>__<KEY>=<yaml value>, e.g.
+RESUME_SCREENER__GITHUB_ANALYSIS__MAX_REPOS=5.
+"""
+import os
+import functools
+import yaml
+
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.yaml')
+ENV_CONFIG_PATH = 'RESUME_SCREENER_CONFIG'
+ENV_OVERRIDE_PREFIX = 'RESUME_SCREENER__'
+
+# Base URLs of the external APIs: environment variable and default, by endpoints key
+ENDPOINTS = {
+    'openai_base_url': ('OPENAI_BASE_URL', 'https://api.openai.com/v1'),
+    'github_api_url': ('GITHUB_API_URL', 'https://api.github.com'),
+}
+
+_config_path = None
+
+def set_config_path(path):
+    """
+    Use the config file at path. Must be called before the pipeline modules
+    are imported, since they read their settings at import time.
+    """
+    global _config_path
+    _config_path = path
+    get_config.cache_clear()
+
+def config_path():
+    return _config_path or os.getenv(ENV_CONFIG_PATH) or DEFAULT_CONFIG_PATH
+
+def _apply_env_overrides(config):
+    for name, value in os.environ.items():
+        if not name.startswith(ENV_OVERRIDE_PREFIX):
+            continue
+        keys = [key.lower() for key in name[len(ENV_OVERRIDE_PREFIX):].split('__') if key]
+        if not keys:
+            continue
+        section = config
+        for key in keys[:-1]:
+            if not isinstance(section.get(key), dict):
+                section[key] = {}
+            section = section[key]
+        section[keys[-1]] = yaml.safe_load(value)
+    return config
+
+@functools.lru_cache(maxsize=None)
+def get_config():
+    """
+    Return the parsed configuration, loading it on first use.
+    """
+    with open(config_path(), 'r') as f:
+        config = yaml.safe_load(f) or {}
+    return _apply_env_overrides(config)
+
+def endpoint_url(name):
+    """
+    Return the base URL of an API in ENDPOINTS, without a trailing slash: its
+    environment variable (e.g. for local stand-ins), else endpoints.<name>
+    in the configuration, else the default.
+    """
+    env_var, default = ENDPOINTS[name]
+    endpoints_config = get_config().get('endpoints', {}) or {}
+    return os.getenv(env_var, endpoints_config.get(name, default)).rstrip('/')
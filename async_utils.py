@@ -0,0 +1,81 @@
+import asyncio
+import functools
+import threading
+import contextvars
+from app_config import get_config
+from concurrent.futures import ThreadPoolExecutor
+
+# Load configuration
+config = get_config()
+
+async_config = config.get('async_pipeline', {}) or {}
+max_blocking_threads = async_config.get('max_blocking_threads', 64)
+
+# Executor shared by every coroutine that has to run blocking git, PyMuPDF or HTTP work
+blocking_executor = ThreadPoolExecutor(max_workers=max_blocking_threads, thread_name_prefix='blocking')
+
+async def run_blocking(func, *args, **kwargs):
+    """
+    Run a blocking function in the shared executor and await its result.
+
+    The caller's context variables (e.g. the screening's metrics breakdown)
+    are visible to the function.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(blocking_executor, functools.partial(context.run, func, *args, **kwargs))
+
+def submit_in_context(executor, func, *args, **kwargs):
+    """
+    Submit func to an executor so that it runs with a copy of the caller's context.
+    """
+    context = contextvars.copy_context()
+    return executor.submit(context.run, func, *args, **kwargs)
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that do the same work.
+
+    While a call for a key is in flight, further callers with that key wait
+    for it and receive its result (or exception) instead of repeating the
+    work. Nothing is kept once the call returns; caching is left to the
+    caches behind the work itself.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        Run func(*args, **kwargs) unless a call for key is already in flight.
+
+        Returns (result, shared), where shared is True for callers that
+        received another caller's result.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
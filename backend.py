@@ -1,45 +1,49 @@
-# backend.py
+import asyncio
+import hashlib
 import logging
-from cv_processing import process_cv
-from github_analysis import extract_github_links, analyze_github_repos
-from openai_interaction import evaluate_candidate
+import contextvars
+from app_config import get_config
+from cv_processing import process_cv_async, CVProcessingError
+from github_analysis import extract_github_links, iter_github_repos_async
+from openai_interaction import evaluate_candidate, APIRequestError
+from async_utils import run_blocking
+from metrics import ScreeningBreakdown, current_breakdown, span
+from candidate_index import CandidateIndex
+from prescreen import load_job_description, candidate_text, score_candidates
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def process_resume(cv_file_path, api_params):
-    # Read file bytes
-    try:
-        with open(cv_file_path, 'rb') as f:
-            file_bytes = f.read()
-    except Exception as e:
-        logger.error(f"Error reading uploaded file: {e}")
-        return "Failed to read the uploaded file."
+# Load configuration
+config = get_config()
 
-    # Process the CV
-    extracted_info, cv_summary, hyperlinks = process_cv(file_bytes, api_params)
+metrics_config = config.get('metrics', {}) or {}
+report_breakdown = metrics_config.get('report_breakdown', False)  # Append per-stage timings to the report
 
-    # Extract GitHub links from the extracted information and hyperlinks
-    cv_text = cv_summary
-    github_links = extract_github_links(cv_text, hyperlinks)
+candidate_index_config = config.get('candidate_index', {}) or {}
+candidate_index = None
+if candidate_index_config.get('enabled', False):
+    candidate_index = CandidateIndex(candidate_index_config.get('path', 'cache/candidates.sqlite3'))
 
-    # Analyze GitHub repositories if any
-    github_summaries = []
-    if github_links:
-        repo_summaries = analyze_github_repos(github_links, api_params)
-        # Generate a combined GitHub summary
-        for repo in repo_summaries:
-            if repo.get('summary'):
-                github_summaries.append(repo['summary'])
-    else:
-        repo_summaries = []
+prescreen_config = config.get('prescreen', {}) or {}
+prescreen_threshold = prescreen_config.get('threshold') if prescreen_config.get('enabled', False) else None
 
-    combined_github_summary = " ".join(github_summaries)
+class ScreeningError(Exception):
+    """Raised when a screening could not produce a complete report."""
 
-    # Evaluate the candidate
-    evaluation = evaluate_candidate(cv_summary, combined_github_summary, api_params)
+def _read_file(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+def _index_candidate(candidate_id, **fields):
+    # Indexing is best effort; a locked or corrupt index must not fail the screening
+    try:
+        candidate_index.upsert(candidate_id, **fields)
+    except Exception as e:
+        logger.warning(f"Could not update the candidate index: {e}")
 
+def build_report(cv_summary, repo_summaries, evaluation):
     # Compile the final report
     report = f"## **Candidate Summary:**\n{cv_summary}\n\n"
 
@@ -54,3 +58,177 @@ def process_resume(cv_file_path, api_params):
     report += f"## **Candidate Evaluation:**\n{evaluation}\n"
 
     return report
+
+async def _extract_cv(file_bytes, cv_file_path, api_params):
+    extracted_info, cv_summary, hyperlinks = await process_cv_async(file_bytes, api_params)
+    cv = {
+        'candidate_id': hashlib.sha256(file_bytes).hexdigest(),
+        'extracted_info': extracted_info,
+        'cv_summary': cv_summary,
+        'hyperlinks': hyperlinks,
+    }
+    # Index the CV right away so its extraction is kept even if a later stage fails
+    if candidate_index is not None:
+        await run_blocking(
+            _index_candidate, cv['candidate_id'],
+            cv_path=cv_file_path, extracted_info=extracted_info, cv_summary=cv_summary
+        )
+    return cv
+
+async def extract_cv_async(cv_file_path, api_params):
+    """
+    Run only the first stage of a screening: read the CV and extract it.
+
+    Returns a dict with candidate_id, extracted_info, cv_summary and
+    hyperlinks, which stream_resume_async accepts as cv= to continue the
+    screening without extracting the CV again. Raises OSError if the file
+    cannot be read and CVProcessingError if it cannot be extracted.
+    """
+    file_bytes = await run_blocking(_read_file, cv_file_path)
+    return await _extract_cv(file_bytes, cv_file_path, api_params)
+
+async def stream_resume_async(cv_file_path, api_params, cv=None):
+    """
+    Screen a CV and yield (event, data) pairs as each stage finishes.
+
+    Events, in order: ('cv', {'extracted_info', 'cv_summary'}), one
+    ('prescreen', {'score', 'threshold'}) if prescreen.threshold is set,
+    ('repo', repo_summary) per analyzed repository as it completes,
+    ('evaluation', text) and, if enabled via metrics.report_breakdown or
+    api_params['timing_breakdown'], ('breakdown', markdown). A failure to read
+    the file yields a single ('error', message).
+
+    A failure to read or extract the CV, or to generate the evaluation,
+    yields ('error', message) and ends the stream.
+
+    cv is the result of extract_cv_async, e.g. from a batch pre-screen; the
+    CV is then neither extracted nor pre-screened again.
+    """
+    breakdown = ScreeningBreakdown()
+    events = asyncio.Queue()
+    context = contextvars.copy_context()
+    context.run(current_breakdown.set, breakdown)
+    # The pipeline task runs in `context`, so every stage records into this screening's breakdown
+    pipeline = context.run(asyncio.ensure_future, _run_pipeline(cv_file_path, api_params, events, cv))
+    try:
+        while True:
+            event = await events.get()
+            if event is None:
+                break
+            yield event
+        await pipeline
+    finally:
+        if not pipeline.done():
+            pipeline.cancel()
+
+    if api_params.get('timing_breakdown', report_breakdown):
+        yield 'breakdown', breakdown.to_markdown()
+
+async def _run_pipeline(cv_file_path, api_params, events, cv):
+    try:
+        with span('screening'):
+            await _screen(cv_file_path, api_params, events, cv)
+    finally:
+        events.put_nowait(None)
+
+async def _screen(cv_file_path, api_params, events, cv=None):
+    prescreened = cv is not None
+    if cv is None:
+        # Read file bytes
+        try:
+            file_bytes = await run_blocking(_read_file, cv_file_path)
+        except Exception as e:
+            logger.error(f"Error reading uploaded file: {e}")
+            events.put_nowait(('error', "Failed to read the uploaded file."))
+            return
+
+        # Process the CV
+        try:
+            cv = await _extract_cv(file_bytes, cv_file_path, api_params)
+        except CVProcessingError as e:
+            logger.error(f"Error extracting the CV: {e}")
+            events.put_nowait(('error', f"Failed to extract information from the CV: {e}."))
+            return
+    candidate_id = cv['candidate_id']
+    extracted_info, cv_summary, hyperlinks = cv['extracted_info'], cv['cv_summary'], cv['hyperlinks']
+    events.put_nowait(('cv', {'extracted_info': extracted_info, 'cv_summary': cv_summary}))
+
+    # Skip GitHub analysis and the evaluation call for CVs far from the job description
+    if prescreen_threshold is not None and not prescreened:
+        score = score_candidates(load_job_description(), [candidate_text(extracted_info, cv_summary)])[0]
+        events.put_nowait(('prescreen', {'score': score, 'threshold': prescreen_threshold}))
+        if score < prescreen_threshold:
+            evaluation = (
+                "**Category**: Mismatch  \n"
+                f"**Explanation**: Screened out before GitHub analysis: the CV's similarity to the job description "
+                f"is {score:.3f}, below the pre-screen threshold of {prescreen_threshold}.\n"
+            )
+            events.put_nowait(('evaluation', evaluation))
+            if candidate_index is not None:
+                await run_blocking(_index_candidate, candidate_id, evaluation=evaluation)
+            return
+
+    # Extract GitHub links from the extracted information and hyperlinks
+    cv_text = cv_summary
+    github_links = extract_github_links(cv_text, hyperlinks)
+
+    # Analyze GitHub repositories if any, reporting each one as it lands
+    repo_summaries = []
+    if github_links:
+        async for repo_summary in iter_github_repos_async(github_links, api_params):
+            repo_summaries.append(repo_summary)
+            events.put_nowait(('repo', repo_summary))
+
+    # Generate a combined GitHub summary
+    github_summaries = [repo['summary'] for repo in repo_summaries if repo.get('summary')]
+    combined_github_summary = " ".join(github_summaries)
+
+    # Evaluate the candidate
+    try:
+        evaluation = await run_blocking(evaluate_candidate, cv_summary, combined_github_summary, api_params)
+    except APIRequestError as e:
+        logger.error(f"Error evaluating the candidate: {e}")
+        events.put_nowait(('error', "The candidate evaluation could not be generated."))
+        return
+    events.put_nowait(('evaluation', evaluation))
+
+    if candidate_index is not None:
+        await run_blocking(_index_candidate, candidate_id, repo_summaries=repo_summaries, evaluation=evaluation)
+
+async def process_resume_async(cv_file_path, api_params, on_event=None, cv=None):
+    """
+    Screen a CV end to end as a coroutine and return the markdown report.
+
+    Blocking PDF, git and HTTP work runs in the shared executor, so a single
+    event loop can drive many screenings at once. on_event, if given, is
+    called with every (event, data) pair of stream_resume_async. Raises
+    ScreeningError if the stream reported an error.
+    """
+    cv_summary = ""
+    repo_summaries = []
+    evaluation = ""
+    breakdown = None
+    async for event, data in stream_resume_async(cv_file_path, api_params, cv):
+        if on_event is not None:
+            on_event(event, data)
+        if event == 'error':
+            raise ScreeningError(data)
+        if event == 'cv':
+            cv_summary = data['cv_summary']
+        elif event == 'repo':
+            repo_summaries.append(data)
+        elif event == 'evaluation':
+            evaluation = data
+        elif event == 'breakdown':
+            breakdown = data
+
+    report = build_report(cv_summary, repo_summaries, evaluation)
+    if breakdown:
+        report += f"\n## **Timing Breakdown:**\n{breakdown}\n"
+    return report
+
+def process_resume(cv_file_path, api_params, cv=None):
+    """
+    Blocking wrapper around process_resume_async.
+    """
+    return asyncio.run(process_resume_async(cv_file_path, api_params, cv=cv))
@@ -0,0 +1,248 @@
+"""
+Screen a batch of CVs from the command line.
+
+    python batch_screen.py cvs/ --output results.jsonl --workers 4
+
+The input is a directory of PDFs or a manifest file listing one PDF path per
+line. Every finished candidate is appended to the output JSONL file, which
+doubles as the checkpoint: re-running the same command skips CVs that already
+have a record, so a crashed batch resumes where it stopped.
+
+With prescreen.enabled, every pending CV is extracted first and the whole
+batch is scored against the job description; only candidates above
+prescreen.threshold, and at most prescreen.top_k of them, go on to GitHub
+analysis and evaluation. The others get a 'screened_out' record, which also
+counts as done on resume, so use a new output file after changing the gate.
+CVs whose extraction fails get an 'error' record and are retried on resume.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import hashlib
+import argparse
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from app_config import get_config, set_config_path
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def collect_cv_paths(source):
+    """
+    Return the PDF paths of a directory (recursively) or of a manifest file.
+    """
+    if os.path.isdir(source):
+        paths = []
+        for root, _, files in os.walk(source):
+            for file in files:
+                if file.lower().endswith('.pdf'):
+                    paths.append(os.path.join(root, file))
+        return sorted(paths)
+
+    base_dir = os.path.dirname(os.path.abspath(source))
+    paths = []
+    with open(source, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            paths.append(line if os.path.isabs(line) else os.path.join(base_dir, line))
+    return paths
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def load_completed(output_path):
+    """
+    Return the CV hashes that already have a successful record in the output.
+    """
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, 'r') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash can leave a truncated last line behind
+                continue
+            if record.get('status') in ('ok', 'screened_out'):
+                completed.add(record.get('cv_sha256'))
+    return completed
+
+class ProgressReporter:
+    def __init__(self, total):
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.started_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def update(self, ok):
+        with self._lock:
+            self.done += 1
+            if not ok:
+                self.failed += 1
+            elapsed = time.monotonic() - self.started_at
+            rate = self.done / elapsed if elapsed else 0.0
+            eta = (self.total - self.done) / rate if rate else float('inf')
+            print(
+                f"[{self.done}/{self.total}] {self.failed} failed | "
+                f"{rate * 60:.1f} CVs/min | elapsed {elapsed:.0f}s | ETA {eta:.0f}s",
+                file=sys.stderr,
+                flush=True
+            )
+
+def screen_cv(cv_path, cv_sha256, api_params, cv=None, prescreen_score=None):
+    from backend import process_resume
+
+    started_at = time.monotonic()
+    record = {'cv_path': cv_path, 'cv_sha256': cv_sha256}
+    if prescreen_score is not None:
+        record['prescreen_score'] = prescreen_score
+    try:
+        record['report'] = process_resume(cv_path, api_params, cv=cv)
+        record['status'] = 'ok'
+    except Exception as e:
+        logger.error(f"Error screening {cv_path}: {e}")
+        record['status'] = 'error'
+        record['error'] = str(e)
+    record['elapsed_seconds'] = round(time.monotonic() - started_at, 3)
+    record['finished_at'] = time.time()
+    return record
+
+def extract_cv(cv_path, api_params):
+    from backend import extract_cv_async
+
+    return asyncio.run(extract_cv_async(cv_path, api_params))
+
+def prescreen_batch(pending, workers, api_params, prescreen_config):
+    """
+    Extract every pending CV, score the batch against the job description
+    and split it into the CVs to screen in full and the records of the rest.
+
+    Returns (selected, records): selected holds (cv_path, cv_sha256, cv,
+    score) tuples, best first; records holds one record per CV that failed
+    extraction or was screened out.
+    """
+    from prescreen import load_job_description, candidate_text, score_candidates, select_candidates
+
+    extracted = []
+    records = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(extract_cv, cv_path, api_params): (cv_path, cv_sha256) for cv_path, cv_sha256 in pending}
+        for future in as_completed(futures):
+            cv_path, cv_sha256 = futures[future]
+            try:
+                cv = future.result()
+                if not cv['cv_summary'] and not cv['extracted_info']:
+                    raise ValueError("the extraction returned no information")
+            except Exception as e:
+                # Not scored: an empty extraction would be screened out for good
+                logger.error(f"Error extracting {cv_path}: {e}")
+                records.append({'cv_path': cv_path, 'cv_sha256': cv_sha256, 'status': 'error', 'error': str(e), 'finished_at': time.time()})
+                continue
+            extracted.append((cv_path, cv_sha256, cv))
+
+    texts = [candidate_text(cv['extracted_info'], cv['cv_summary']) for _, _, cv in extracted]
+    scores = score_candidates(load_job_description(), texts)
+    chosen = select_candidates(scores, prescreen_config.get('threshold'), prescreen_config.get('top_k'))
+
+    selected = [extracted[index] + (scores[index],) for index in chosen]
+    chosen = set(chosen)
+    for index, (cv_path, cv_sha256, cv) in enumerate(extracted):
+        if index not in chosen:
+            records.append({
+                'cv_path': cv_path,
+                'cv_sha256': cv_sha256,
+                'status': 'screened_out',
+                'prescreen_score': scores[index],
+                'cv_summary': cv['cv_summary'],
+                'finished_at': time.time(),
+            })
+    logger.info(f"Pre-screen kept {len(selected)} of {len(extracted)} extracted CVs")
+    return selected, records
+
+def run_batch(source, output_path, workers, api_params):
+    cv_paths = collect_cv_paths(source)
+    completed = load_completed(output_path)
+
+    pending = []
+    for cv_path in cv_paths:
+        try:
+            cv_sha256 = file_sha256(cv_path)
+        except OSError as e:
+            logger.error(f"Cannot read {cv_path}: {e}")
+            continue
+        if cv_sha256 in completed:
+            continue
+        completed.add(cv_sha256)  # Also skips duplicate files within this batch
+        pending.append((cv_path, cv_sha256))
+
+    logger.info(f"{len(cv_paths)} CVs found, {len(cv_paths) - len(pending)} already screened, {len(pending)} to go")
+    if not pending:
+        return
+
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    def write_record(output, record):
+        output.write(json.dumps(record) + "\n")
+        output.flush()
+        os.fsync(output.fileno())
+
+    prescreen_config = get_config().get('prescreen', {}) or {}
+    if prescreen_config.get('enabled', False):
+        selected, records = prescreen_batch(pending, workers, api_params, prescreen_config)
+        with open(output_path, 'a') as output:
+            for record in records:
+                write_record(output, record)
+        jobs = [(cv_path, cv_sha256, api_params, cv, score) for cv_path, cv_sha256, cv, score in selected]
+    else:
+        jobs = [(cv_path, cv_sha256, api_params) for cv_path, cv_sha256 in pending]
+    if not jobs:
+        return
+
+    progress = ProgressReporter(len(jobs))
+    write_lock = threading.Lock()
+    with open(output_path, 'a') as output, ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(screen_cv, *job) for job in jobs]
+        for future in as_completed(futures):
+            record = future.result()
+            with write_lock:
+                write_record(output, record)
+            progress.update(record['status'] == 'ok')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Screen a batch of CV PDFs and write one JSONL record per candidate.")
+    parser.add_argument('source', help="Directory of CV PDFs or a manifest file with one PDF path per line")
+    parser.add_argument('--output', default='screening_results.jsonl', help="JSONL output file, also used to resume")
+    parser.add_argument('--workers', type=int, default=4, help="Number of CVs screened in parallel")
+    parser.add_argument('--temperature', type=float, default=None, help="Defaults to api_params.temperature")
+    parser.add_argument('--max-tokens', type=int, default=None, help="Defaults to api_params.max_tokens")
+    parser.add_argument('--config', help="Path to config.yaml (defaults to $RESUME_SCREENER_CONFIG or the bundled file)")
+    args = parser.parse_args(argv)
+
+    if args.config:
+        set_config_path(args.config)
+    api_config = get_config().get('api_params', {})
+
+    api_params = {
+        'temperature': args.temperature if args.temperature is not None else api_config.get('temperature', 0.7),
+        'max_tokens': args.max_tokens if args.max_tokens is not None else api_config.get('max_tokens', 1500),
+        'n': api_config.get('n', 1),
+    }
+    run_batch(args.source, args.output, args.workers, api_params)
+
+if __name__ == "__main__":
+    main()
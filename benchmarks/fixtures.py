@@ -0,0 +1,85 @@
+"""
+Synthetic inputs for the benchmarks: CV PDFs and git repositories.
+"""
+import os
+import random
+
+import fitz  # PyMuPDF
+from git import Repo
+
+LOREM = (
+    "Built document layout analysis and OCR pipelines with PyTorch, trained "
+    "transformer models for table detection and deployed them as REST services. "
+)
+
+def make_cv_pdf(path, pages=2, github_user='benchuser'):
+    """
+    Write a CV PDF with `pages` pages of text and a hyperlink to the GitHub profile.
+    """
+    doc = fitz.open()
+    for page_index in range(pages):
+        page = doc.new_page()
+        text = f"Bench Candidate - page {page_index + 1}\n\n" + (LOREM * 12)
+        page.insert_textbox(fitz.Rect(50, 50, 550, 780), text, fontsize=10)
+        if page_index == 0:
+            link_rect = fitz.Rect(50, 790, 300, 805)
+            page.insert_text(link_rect.bl, f"https://github.com/{github_user}", fontsize=9)
+            page.insert_link({'kind': fitz.LINK_URI, 'from': link_rect, 'uri': f"https://github.com/{github_user}"})
+    doc.save(path)
+    doc.close()
+    return path
+
+def _python_module(index, functions):
+    lines = [f'"""Synthetic module {index}."""', "import os", ""]
+    for function_index in range(functions):
+        lines += [
+            f"def function_{index}_{function_index}(values):",
+            "    total = 0",
+            "    for value in values:",
+            "        if value % 2:",
+            "            total += value",
+            "    return total",
+            "",
+        ]
+    return "\n".join(lines)
+
+def make_git_repo(path, files=10, functions_per_file=20, seed=0):
+    """
+    Create a committed git repository with a README, a manifest, `files`
+    Python modules and some vendored noise that the reader should skip.
+    """
+    rng = random.Random(seed)
+    os.makedirs(os.path.join(path, 'src'), exist_ok=True)
+    os.makedirs(os.path.join(path, 'node_modules', 'dep'), exist_ok=True)
+    with open(os.path.join(path, 'README.md'), 'w') as f:
+        f.write(f"# {os.path.basename(path)}\n\n{LOREM}\n")
+    with open(os.path.join(path, 'requirements.txt'), 'w') as f:
+        f.write("numpy\ntorch\npillow\n")
+    with open(os.path.join(path, 'node_modules', 'dep', 'index.js'), 'w') as f:
+        f.write("module.exports = 1;\n" * 1000)
+    for index in range(files):
+        with open(os.path.join(path, 'src', f"module_{index}.py"), 'w') as f:
+            f.write(_python_module(index, rng.randint(functions_per_file // 2, functions_per_file)))
+
+    repo = Repo.init(path)
+    repo.index.add([
+        os.path.relpath(os.path.join(root, file), path)
+        for root, dirs, names in os.walk(path)
+        if '.git' not in root.split(os.sep)
+        for file in names
+    ])
+    repo.index.commit("Initial commit")
+    return path
+
+def make_repo_set(root, username='benchuser', sizes=(5, 20, 80)):
+    """
+    Generate one repository per entry of `sizes` (number of modules) and
+    return the (repo_name, local_path) pairs the mock GitHub serves.
+    """
+    repos = []
+    for index, files in enumerate(sizes):
+        name = f"repo-{files}-files"
+        path = os.path.join(root, username, name)
+        make_git_repo(path, files=files, seed=index)
+        repos.append((name, path))
+    return repos
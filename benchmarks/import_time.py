@@ -0,0 +1,70 @@
+"""
+Measure how long the pipeline's entry modules take to import.
+
+    python -m benchmarks.import_time --runs 10
+
+Each module is imported in a fresh interpreter. The script reports the
+median wall time and, from `python -X importtime`, the slowest imports and
+whether heavy dependencies (PyMuPDF, GitPython, requests, tiktoken, gradio)
+were pulled in at import time.
+"""
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('fitz', 'git', 'requests', 'tiktoken', 'gradio')
+
+def _run(code, extra_args=()):
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    return subprocess.run(
+        [sys.executable, *extra_args, '-c', code],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True
+    )
+
+def measure(module, runs):
+    code = (
+        "import sys, time\n"
+        "started_at = time.perf_counter()\n"
+        f"import {module}\n"
+        "print(time.perf_counter() - started_at)\n"
+        f"print(','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))\n"
+    )
+    timings = []
+    heavy = ''
+    for _ in range(runs):
+        lines = _run(code).stdout.strip().splitlines()
+        timings.append(float(lines[0]))
+        heavy = lines[1] if len(lines) > 1 else ''
+    return statistics.median(timings), heavy
+
+def slowest_imports(module, top):
+    """
+    Return the `top` (cumulative microseconds, module) pairs from -X importtime.
+    """
+    stderr = _run(f"import {module}", ['-X', 'importtime']).stderr
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = [part.strip() for part in line[len('import time:'):].split('|')]
+        entries.append((int(cumulative), name.strip()))
+    return sorted(entries, reverse=True)[:top]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark import time of the pipeline entry points.")
+    parser.add_argument('modules', nargs='*', default=['backend', 'batch_screen'])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    for module in args.modules:
+        median, heavy = measure(module, args.runs)
+        print(f"{module}: median {median * 1000:.1f} ms over {args.runs} runs; heavy modules loaded: {heavy or 'none'}")
+        for cumulative, name in slowest_imports(module, args.top):
+            print(f"    {cumulative / 1000:8.1f} ms  {name}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Local stand-ins for the OpenAI chat-completions and GitHub REST endpoints.
+
+The server answers:
+
+- POST /v1/chat/completions with a canned completion (JSON for vision
+  requests, plain text otherwise) and a `usage` block;
+- GET /users/<user>/repos with a paginated listing of the generated repos;
+- GET /repos/<owner>/<repo>/tarball with a gzipped tarball of a generated repo.
+
+Latency, error rate and a per-second rate limit are configurable so the
+pipeline's retry and concurrency behaviour can be exercised offline.
+"""
+import io
+import json
+import time
+import random
+import tarfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+class MockSettings:
+    def __init__(self, latency=0.05, jitter=0.02, error_rate=0.0, rate_limit_per_second=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_per_second = rate_limit_per_second
+
+class MockServices:
+    """
+    Threaded HTTP server serving both mocked APIs on 127.0.0.1.
+
+    repos maps a GitHub username to a list of (repo_name, local_path) pairs.
+    """
+    def __init__(self, repos, settings=None, github_user_for_cv='benchuser'):
+        self.repos = repos
+        self.settings = settings or MockSettings()
+        self.github_user_for_cv = github_user_for_cv
+        self.request_counts = {}
+        self._window = (0, 0)  # (second, requests in that second)
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler_class())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _count(self, route):
+        with self._lock:
+            self.request_counts[route] = self.request_counts.get(route, 0) + 1
+
+    def _rate_limited(self):
+        limit = self.settings.rate_limit_per_second
+        if not limit:
+            return False
+        with self._lock:
+            second = int(time.time())
+            window_second, count = self._window
+            if window_second != second:
+                window_second, count = second, 0
+            count += 1
+            self._window = (window_second, count)
+            return count > limit
+
+    def _handler_class(self):
+        services = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, body, content_type='application/json', headers=None):
+                if isinstance(body, str):
+                    body = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _simulate(self):
+                """
+                Apply latency, rate limiting and random errors. Returns True if
+                the request was already answered with an error.
+                """
+                settings = services.settings
+                time.sleep(max(0.0, settings.latency + random.uniform(-settings.jitter, settings.jitter)))
+                if services._rate_limited():
+                    self._send(429, json.dumps({'message': 'rate limited'}), headers={'Retry-After': '1'})
+                    return True
+                if settings.error_rate and random.random() < settings.error_rate:
+                    self._send(500, json.dumps({'message': 'injected error'}))
+                    return True
+                return False
+
+            def do_POST(self):
+                path = urlparse(self.path).path
+                if path != '/v1/chat/completions':
+                    self._send(404, json.dumps({'message': 'not found'}))
+                    return
+                services._count('chat')
+                length = int(self.headers.get('Content-Length') or 0)
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                if self._simulate():
+                    return
+                self._send(200, json.dumps(services.chat_completion(payload)))
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                parts = parsed.path.strip('/').split('/')
+                if len(parts) == 3 and parts[0] == 'users' and parts[2] == 'repos':
+                    services._count('list_repos')
+                    if self._simulate():
+                        return
+                    self._send_listing(parts[1], parse_qs(parsed.query))
+                elif len(parts) == 4 and parts[0] == 'repos' and parts[3] == 'tarball':
+                    services._count('tarball')
+                    if self._simulate():
+                        return
+                    self._send_tarball(parts[1], parts[2])
+                else:
+                    self._send(404, json.dumps({'message': 'not found'}))
+
+            def _send_listing(self, username, query):
+                if username not in services.repos:
+                    self._send(404, json.dumps({'message': 'Not Found'}))
+                    return
+                per_page = int(query.get('per_page', ['30'])[0])
+                page = int(query.get('page', ['1'])[0])
+                user_repos = services.repos[username]
+                last_page = max(1, -(-len(user_repos) // per_page))
+                listing = [
+                    {
+                        'name': name,
+                        'html_url': f"{services.base_url}/{username}/{name}",
+                        'fork': False,
+                        'size': 1,
+                        'language': 'Python',
+                        'stargazers_count': index,
+                        'pushed_at': '2024-01-01T00:00:00Z',
+                        'description': f"Synthetic repository {name}",
+                    }
+                    for index, (name, _) in enumerate(user_repos[(page - 1) * per_page:page * per_page])
+                ]
+                base = f"{services.base_url}/users/{username}/repos?per_page={per_page}"
+                links = []
+                if page < last_page:
+                    links.append(f'<{base}&page={page + 1}>; rel="next"')
+                    links.append(f'<{base}&page={last_page}>; rel="last"')
+                headers = {'Link': ", ".join(links)} if links else {}
+                self._send(200, json.dumps(listing), headers=headers)
+
+            def _send_tarball(self, owner, repo_name):
+                local_path = dict(services.repos.get(owner, [])).get(repo_name)
+                if local_path is None:
+                    self._send(404, json.dumps({'message': 'Not Found'}))
+                    return
+                buffer = io.BytesIO()
+                with tarfile.open(fileobj=buffer, mode='w:gz') as archive:
+                    archive.add(local_path, arcname=f"{owner}-{repo_name}-0000000",
+                                filter=lambda info: None if '/.git' in info.name else info)
+                self._send(200, buffer.getvalue(), content_type='application/x-gzip')
+
+        return Handler
+
+    def chat_completion(self, payload):
+        messages = payload.get('messages', [])
+        content = messages[-1].get('content', '') if messages else ''
+        is_vision = isinstance(content, list) and any(part.get('type') == 'image_url' for part in content)
+        if is_vision:
+            text = json.dumps({
+                'extracted_info': {
+                    'Full Name': 'Bench Candidate',
+                    'Technical Skills': ['Python', 'PyTorch', 'OCR'],
+                    'GitHub Links': [f"https://github.com/{self.github_user_for_cv}"],
+                },
+                'cv_summary': f"Machine learning engineer. GitHub: https://github.com/{self.github_user_for_cv}",
+            })
+        else:
+            text = "Synthetic summary: Python project using OCR and layout analysis."
+        prompt_chars = len(json.dumps(messages))
+        return {
+            'id': 'chatcmpl-bench',
+            'object': 'chat.completion',
+            'model': payload.get('model'),
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': text}, 'finish_reason': 'stop'}],
+            'usage': {
+                'prompt_tokens': prompt_chars // 4,
+                'completion_tokens': len(text) // 4,
+                'total_tokens': (prompt_chars + len(text)) // 4,
+            },
+        }
@@ -0,0 +1,137 @@
+"""
+Offline benchmarks for the screening pipeline.
+
+Run from the repository root (or anywhere, with the repository on PYTHONPATH):
+
+    python -m benchmarks.run_benchmarks --iterations 5 --latency 0.2
+
+A local mock of the OpenAI and GitHub APIs is started and the pipeline is
+pointed at it through OPENAI_BASE_URL and GITHUB_API_URL. Response caches and
+the candidate index are disabled so every iteration does the full work, and
+repositories are fetched as tarballs, the only mode the mock serves. For each stage the script
+reports latency percentiles, throughput and the process's peak RSS after
+the stage (ru_maxrss is a high-water mark, so stages run in order of
+expected memory use).
+"""
+import os
+import sys
+import json
+import time
+import resource
+import argparse
+import shutil
+import tempfile
+import statistics
+
+from app_config import set_config_path
+from benchmarks.fixtures import make_cv_pdf, make_repo_set
+from benchmarks.mock_services import MockServices, MockSettings
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def run_stage(name, func, iterations):
+    latencies = []
+    started_at = time.perf_counter()
+    for _ in range(iterations):
+        iteration_started_at = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - iteration_started_at)
+    wall = time.perf_counter() - started_at
+    return {
+        'stage': name,
+        'iterations': iterations,
+        'p50_s': percentile(latencies, 0.50),
+        'p90_s': percentile(latencies, 0.90),
+        'p99_s': percentile(latencies, 0.99),
+        'mean_s': statistics.mean(latencies),
+        'throughput_per_s': iterations / wall if wall else 0.0,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+def print_results(results):
+    header = f"{'stage':<22}{'iter':>6}{'p50 s':>10}{'p90 s':>10}{'p99 s':>10}{'mean s':>10}{'ops/s':>10}{'RSS MB':>10}"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        print(
+            f"{result['stage']:<22}{result['iterations']:>6}{result['p50_s']:>10.3f}{result['p90_s']:>10.3f}"
+            f"{result['p99_s']:>10.3f}{result['mean_s']:>10.3f}{result['throughput_per_s']:>10.2f}{result['peak_rss_mb']:>10.1f}"
+        )
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the screening pipeline against local API stand-ins.")
+    parser.add_argument('--iterations', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.05, help="Mean mock response latency in seconds")
+    parser.add_argument('--jitter', type=float, default=0.02)
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of mock requests answered with 500")
+    parser.add_argument('--rate-limit', type=int, default=None, help="Mock requests per second before answering 429")
+    parser.add_argument('--repo-sizes', default='5,20,80', help="Comma-separated module counts of the generated repos")
+    parser.add_argument('--cv-pages', type=int, default=2)
+    parser.add_argument('--json', help="Also write the results to this JSON file")
+    parser.add_argument('--config', help="Path to config.yaml used by the pipeline")
+    args = parser.parse_args(argv)
+    if args.config:
+        set_config_path(args.config)
+
+    workdir = tempfile.mkdtemp(prefix='resume-bench-')
+    try:
+        username = 'benchuser'
+        repos = make_repo_set(os.path.join(workdir, 'repos'), username, [int(size) for size in args.repo_sizes.split(',')])
+        cv_path = make_cv_pdf(os.path.join(workdir, 'cv.pdf'), pages=args.cv_pages, github_user=username)
+
+        settings = MockSettings(args.latency, args.jitter, args.error_rate, args.rate_limit)
+        services = MockServices({username: repos}, settings, github_user_for_cv=username).start()
+        os.environ['OPENAI_BASE_URL'] = f"{services.base_url}/v1"
+        os.environ['GITHUB_API_URL'] = services.base_url
+        os.environ.setdefault('OPENAI_API_KEY', 'bench')
+        os.environ['RESUME_SCREENER__GITHUB_ANALYSIS__FETCH_MODE'] = 'tarball'
+        os.environ['RESUME_SCREENER__CANDIDATE_INDEX__ENABLED'] = 'false'
+
+        # Import the pipeline only after the endpoints and overrides are in place
+        import openai_interaction
+        import github_analysis
+        from backend import process_resume
+        from cv_processing import process_cv
+        from process_files import read_code_files
+
+        # Measure real work rather than cache hits
+        openai_interaction.llm_cache = None
+        github_analysis.summary_cache = None
+        github_analysis.listing_cache = None
+
+        api_params = {'temperature': 0.0, 'max_tokens': 500, 'n': 1}
+        with open(cv_path, 'rb') as f:
+            cv_bytes = f.read()
+
+        results = [
+            run_stage('read_code_files', lambda: [read_code_files(path) for _, path in repos], args.iterations),
+            run_stage('process_cv', lambda: process_cv(cv_bytes, api_params), args.iterations),
+            run_stage(
+                'analyze_github_repos',
+                lambda: github_analysis.analyze_github_repos([f"https://github.com/{username}"], api_params),
+                args.iterations
+            ),
+            run_stage('process_resume', lambda: process_resume(cv_path, api_params), args.iterations),
+        ]
+        services.stop()
+
+        print_results(results)
+        print(f"\nMock requests served: {services.request_counts}")
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump({'settings': vars(args), 'results': results, 'requests': services.request_counts}, f, indent=2)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
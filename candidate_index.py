@@ -0,0 +1,220 @@
+"""
+Searchable index of screened candidates.
+
+Every screening stores the candidate's extracted CV information, CV summary,
+repository summaries and evaluation in SQLite with an FTS5 full-text index,
+so candidates can be searched and re-ranked for a new opening without any
+further LLM calls:
+
+    python candidate_index.py "pytorch AND (ocr OR \"document analysis\")"
+    python candidate_index.py --skill python --skill pytorch --limit 50
+"""
+import os
+import json
+import time
+import sqlite3
+import argparse
+import logging
+
+from app_config import get_config, set_config_path
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Columns of the full-text index, in MATCH column-filter syntax order
+FTS_COLUMNS = ('name', 'skills', 'cv_summary', 'extracted', 'repos', 'evaluation')
+
+def _flatten(value):
+    """
+    Join every string, number and key of nested extracted_info into plain text.
+    """
+    if isinstance(value, dict):
+        return " ".join(f"{key} {_flatten(item)}" for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return " ".join(_flatten(item) for item in value)
+    if value is None:
+        return ""
+    return str(value)
+
+def _find_fields(extracted_info, predicate):
+    """
+    Return the values of extracted_info entries whose key matches predicate,
+    at any nesting depth.
+    """
+    found = []
+    if isinstance(extracted_info, dict):
+        for key, value in extracted_info.items():
+            if predicate(str(key).lower()):
+                found.append(value)
+            else:
+                found.extend(_find_fields(value, predicate))
+    elif isinstance(extracted_info, list):
+        for item in extracted_info:
+            found.extend(_find_fields(item, predicate))
+    return found
+
+def candidate_name(extracted_info):
+    names = _find_fields(extracted_info, lambda key: key in ('full name', 'full_name', 'name'))
+    return next((name for name in names if isinstance(name, str)), "")
+
+def candidate_skills(extracted_info):
+    return _flatten(_find_fields(extracted_info, lambda key: 'skill' in key))
+
+def _quote(term):
+    return '"' + term.replace('"', '""') + '"'
+
+class CandidateIndex:
+    """
+    SQLite store of screening results with a full-text index over them.
+
+    Candidates are keyed by the SHA-256 of their CV file. upsert() merges
+    the given fields into the stored record, so a screening can be indexed
+    stage by stage and a re-screened CV replaces its earlier results.
+    """
+    def __init__(self, path='cache/candidates.sqlite3'):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS candidates ("
+                " candidate_id TEXT PRIMARY KEY,"
+                " cv_path TEXT,"
+                " name TEXT,"
+                " extracted_info TEXT,"
+                " cv_summary TEXT,"
+                " repo_summaries TEXT,"
+                " evaluation TEXT,"
+                " updated_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS candidates_fts USING fts5("
+                " candidate_id UNINDEXED, " + ", ".join(FTS_COLUMNS) + ","
+                " tokenize = 'porter unicode61')"
+            )
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def upsert(self, candidate_id, cv_path=None, extracted_info=None, cv_summary=None,
+               repo_summaries=None, evaluation=None):
+        """
+        Insert or update a candidate; fields left as None keep their stored value.
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM candidates WHERE candidate_id = ?", (candidate_id,)).fetchone()
+            record = self._decode(row) if row is not None else {}
+            updates = {
+                'cv_path': cv_path,
+                'extracted_info': extracted_info,
+                'cv_summary': cv_summary,
+                'repo_summaries': repo_summaries,
+                'evaluation': evaluation,
+            }
+            record.update({key: value for key, value in updates.items() if value is not None})
+            name = candidate_name(record.get('extracted_info'))
+            repos = record.get('repo_summaries') or []
+
+            conn.execute(
+                "INSERT OR REPLACE INTO candidates"
+                " (candidate_id, cv_path, name, extracted_info, cv_summary, repo_summaries, evaluation, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    candidate_id,
+                    record.get('cv_path'),
+                    name,
+                    json.dumps(record.get('extracted_info')),
+                    record.get('cv_summary'),
+                    json.dumps(repos),
+                    record.get('evaluation'),
+                    time.time(),
+                )
+            )
+            conn.execute("DELETE FROM candidates_fts WHERE candidate_id = ?", (candidate_id,))
+            conn.execute(
+                "INSERT INTO candidates_fts (candidate_id, " + ", ".join(FTS_COLUMNS) + ")"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    candidate_id,
+                    name,
+                    candidate_skills(record.get('extracted_info')),
+                    record.get('cv_summary') or "",
+                    _flatten(record.get('extracted_info')),
+                    " ".join(f"{repo.get('repo_name', '')} {repo.get('summary', '')}" for repo in repos),
+                    record.get('evaluation') or "",
+                )
+            )
+
+    @staticmethod
+    def _decode(row):
+        record = dict(row)
+        record['extracted_info'] = json.loads(record['extracted_info']) if record['extracted_info'] else None
+        record['repo_summaries'] = json.loads(record['repo_summaries']) if record['repo_summaries'] else []
+        return record
+
+    def get(self, candidate_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM candidates WHERE candidate_id = ?", (candidate_id,)).fetchone()
+        return self._decode(row) if row is not None else None
+
+    def search(self, query, limit=20):
+        """
+        Run an FTS5 query and return the best matches, most relevant first.
+
+        The query uses FTS5 syntax: terms, "phrases", AND/OR/NOT, prefix*
+        and column filters such as skills:pytorch. Each result holds the
+        candidate id, name, CV path, BM25 score (lower is better) and a
+        snippet of the matching text.
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT f.candidate_id, c.name, c.cv_path, bm25(candidates_fts) AS score,"
+                " snippet(candidates_fts, -1, '[', ']', '...', 12) AS snippet"
+                " FROM candidates_fts AS f JOIN candidates AS c ON c.candidate_id = f.candidate_id"
+                " WHERE candidates_fts MATCH ? ORDER BY score LIMIT ?",
+                (query, limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def search_skills(self, skills, limit=20, require_all=True):
+        """
+        Return candidates whose extracted skills mention the given skills.
+        """
+        operator = " AND " if require_all else " OR "
+        query = operator.join(f"skills:{_quote(skill)}" for skill in skills)
+        return self.search(query, limit)
+
+    def count(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search the index of screened candidates.")
+    parser.add_argument('query', nargs='?', help="FTS5 query, e.g. 'pytorch AND ocr'")
+    parser.add_argument('--skill', action='append', default=[], help="Required skill (repeatable)")
+    parser.add_argument('--any', action='store_true', help="Match any of the --skill values instead of all")
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--config', help="Path to config.yaml")
+    args = parser.parse_args(argv)
+
+    if args.config:
+        set_config_path(args.config)
+    index_config = get_config().get('candidate_index', {}) or {}
+    index = CandidateIndex(index_config.get('path', 'cache/candidates.sqlite3'))
+
+    if args.skill:
+        results = index.search_skills(args.skill, args.limit, require_all=not args.any)
+    elif args.query:
+        results = index.search(args.query, args.limit)
+    else:
+        parser.error("give a query or at least one --skill")
+    for result in results:
+        print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import logging
+from functools import lru_cache
+
+from process_files import CHARS_PER_TOKEN
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+@lru_cache(maxsize=None)
+def _encoding_for(model):
+    # Imported on first use; tiktoken is slow to import and optional
+    try:
+        import tiktoken
+    except ImportError:  # Fall back to a character estimate when tiktoken is not installed
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding('cl100k_base')
+
+def count_tokens(text, model='gpt-3.5-turbo'):
+    encoding = _encoding_for(model)
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+def truncate_to_tokens(text, max_tokens, model='gpt-3.5-turbo'):
+    """
+    Return the longest prefix of text that fits in max_tokens.
+    """
+    encoding = _encoding_for(model)
+    if encoding is None:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
+
+def chunk_sections(sections, max_chunk_tokens, max_total_tokens=None, model='gpt-3.5-turbo', packed=None):
+    """
+    Pack file sections into chunks of at most max_chunk_tokens tokens.
+
+    Chunks are split on file boundaries; a single file larger than a chunk is
+    cut into chunk-sized pieces. Packing stops once max_total_tokens tokens
+    have been placed, which bounds the cost of summarizing large repositories.
+    If packed is a list, the indices of the sections placed in full are
+    appended to it.
+    """
+    chunks = []
+    current = []
+    current_tokens = 0
+    total_tokens = 0
+
+    for index, section in enumerate(sections):
+        if max_total_tokens is not None and total_tokens >= max_total_tokens:
+            break
+        tokens = count_tokens(section, model)
+        if max_total_tokens is not None and total_tokens + tokens > max_total_tokens:
+            section = truncate_to_tokens(section, max_total_tokens - total_tokens, model)
+            tokens = count_tokens(section, model)
+        elif packed is not None:
+            packed.append(index)
+
+        # Oversized files become chunks of their own
+        while tokens > max_chunk_tokens:
+            piece = truncate_to_tokens(section, max_chunk_tokens, model)
+            if not piece:
+                break
+            if current:
+                chunks.append("".join(current))
+                current, current_tokens = [], 0
+            chunks.append(piece)
+            total_tokens += max_chunk_tokens
+            section = section[len(piece):]
+            tokens = count_tokens(section, model)
+
+        if not section:
+            continue
+        if current_tokens + tokens > max_chunk_tokens and current:
+            chunks.append("".join(current))
+            current, current_tokens = [], 0
+        current.append(section)
+        current_tokens += tokens
+        total_tokens += tokens
+
+    if current:
+        chunks.append("".join(current))
+    return chunks
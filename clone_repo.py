@@ -1,28 +1,281 @@
-# clone_repo.py
-from git import Repo, GitCommandError
 import os
 import shutil
+import tarfile
 import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from app_config import get_config, endpoint_url
+
+from process_files import DEFAULT_EXTENSIONS, MANIFEST_FILES
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def clone_github_repo(github_url, local_path='cloned_repo'):
+# Load configuration
+config = get_config()
+
+# Base URL of the GitHub REST API; GITHUB_API_URL overrides it (e.g. for local stand-ins)
+github_api_url = endpoint_url('github_api_url')
+
+FETCH_MODES = ('full', 'shallow', 'tarball', 'mirror')
+
+class FetchLimitExceeded(Exception):
+    """Raised when a repository download grows past the configured byte cap."""
+
+class _CappedStream:
+    """
+    File-like wrapper that counts the bytes read from a stream and aborts once
+    the cap is exceeded, so oversized archives are never fully downloaded.
+    """
+    def __init__(self, raw, max_bytes=None):
+        self.raw = raw
+        self.max_bytes = max_bytes
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = self.raw.read(size)
+        self.bytes_read += len(chunk)
+        if self.max_bytes and self.bytes_read > self.max_bytes:
+            raise FetchLimitExceeded(f"download exceeded {self.max_bytes} bytes")
+        return chunk
+
+def parse_owner_repo(github_url):
+    """
+    Return the (owner, repo) pair of a GitHub repository URL, or None.
+    """
+    path_parts = urlparse(github_url).path.strip('/').split('/')
+    if len(path_parts) < 2:
+        return None
+    owner, repo = path_parts[0], path_parts[1]
+    if repo.endswith('.git'):
+        repo = repo[:-len('.git')]
+    return owner, repo
+
+def get_remote_head_sha(github_url):
+    """
+    Return the commit SHA the remote HEAD points at, without cloning.
+    """
+    from git import Git, GitCommandError
+
+    try:
+        output = Git().ls_remote(github_url, 'HEAD')
+    except GitCommandError as e:
+        logger.warning(f"Could not resolve remote HEAD of {github_url}: {e}")
+        return None
+    except Exception as e:
+        logger.warning(f"Error running ls-remote for {github_url}: {e}")
+        return None
+    for line in output.splitlines():
+        parts = line.split()
+        if len(parts) == 2 and parts[1] == 'HEAD':
+            return parts[0]
+    return None
+
+def directory_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for file in files:
+            try:
+                total += os.path.getsize(os.path.join(root, file))
+            except OSError:
+                continue
+    return total
+
+def _remove_existing(local_path):
     if os.path.exists(local_path):
         try:
             shutil.rmtree(local_path)
             logger.info(f"Removed existing directory {local_path}")
         except Exception as e:
             logger.error(f"Failed to remove existing directory {local_path}: {e}")
-            return None
+            return False
+    return True
+
+def _is_safe_member(member, local_path, target):
+    if not (member.isfile() or member.isdir()):
+        return False
+    return os.path.realpath(target).startswith(os.path.realpath(local_path) + os.sep)
+
+def download_github_tarball(github_url, local_path, max_bytes=None, extensions=None, timeout=30):
+    """
+    Stream the latest tree of a repository from GitHub's tarball endpoint and
+    extract only the files matching the allowed extensions.
+
+    The download is aborted as soon as more than max_bytes have been received.
+    """
+    import requests
+    import http_client
+
+    if extensions is None:
+        extensions = DEFAULT_EXTENSIONS
+    owner_repo = parse_owner_repo(github_url)
+    if not owner_repo:
+        logger.error(f"Cannot derive owner/repo from {github_url}")
+        return None
+    owner, repo = owner_repo
+
+    headers = {}
+    github_access_token = os.getenv("GITHUB_ACCESS_TOKEN")
+    if github_access_token:
+        headers['Authorization'] = f'token {github_access_token}'
+
+    url = f"{github_api_url}/repos/{owner}/{repo}/tarball"
+    os.makedirs(local_path, exist_ok=True)
     try:
-        Repo.clone_from(github_url, local_path)
-        logger.info(f"Cloned repository {github_url} to {local_path}")
+        with http_client.get(url, headers=headers, stream=True, timeout=timeout) as response:
+            response.raise_for_status()
+            content_length = int(response.headers.get('Content-Length') or 0)
+            if max_bytes and content_length > max_bytes:
+                raise FetchLimitExceeded(f"archive is {content_length} bytes")
+            stream = _CappedStream(response.raw, max_bytes)
+            with tarfile.open(fileobj=stream, mode='r|gz') as archive:
+                for member in archive:
+                    # Strip the "<owner>-<repo>-<sha>/" prefix GitHub adds
+                    relative = member.name.split('/', 1)[1] if '/' in member.name else ''
+                    if not relative or not member.isfile():
+                        continue
+                    if not (relative.endswith(tuple(extensions)) or os.path.basename(relative) in MANIFEST_FILES):
+                        continue
+                    target = os.path.join(local_path, relative)
+                    if not _is_safe_member(member, local_path, target):
+                        logger.warning(f"Skipping unsafe archive member: {member.name}")
+                        continue
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    source = archive.extractfile(member)
+                    if source is None:
+                        continue
+                    with open(target, 'wb') as f:
+                        shutil.copyfileobj(source, f)
+        logger.info(f"Downloaded tarball of {github_url} to {local_path} ({stream.bytes_read} bytes)")
         return local_path
-    except GitCommandError as e:
-        logger.error(f"Git command error while cloning {github_url}: {e}")
-        return None
+    except FetchLimitExceeded as e:
+        logger.warning(f"Skipping repository {github_url}: {e} (limit {max_bytes} bytes)")
+    except (requests.RequestException, tarfile.TarError) as e:
+        logger.error(f"Error downloading tarball for {github_url}: {e}")
     except Exception as e:
-        logger.error(f"Error cloning repository {github_url}: {e}")
+        logger.error(f"Error extracting tarball for {github_url}: {e}")
+    shutil.rmtree(local_path, ignore_errors=True)
+    return None
+
+def clone_github_repo(github_url, local_path='cloned_repo', mode='full', max_bytes=None, extensions=None, mirror_cache=None):
+    """
+    Fetch a GitHub repository into local_path.
+
+    mode selects how much is fetched: 'full' clones the whole history,
+    'shallow' clones only the latest commit of the default branch,
+    'tarball' streams the latest tree and keeps only files with the allowed
+    extensions, and 'mirror' checks out from mirror_cache (a MirrorCache),
+    fetching only what changed since the repository was last mirrored.
+    max_bytes caps the amount of data fetched.
+    """
+    from git import Repo, GitCommandError
+
+    if mode not in FETCH_MODES:
+        logger.warning(f"Unknown fetch mode '{mode}', falling back to 'full'")
+        mode = 'full'
+    if mode == 'mirror' and mirror_cache is None:
+        logger.warning("Fetch mode 'mirror' needs a mirror cache, falling back to 'full'")
+        mode = 'full'
+    if not _remove_existing(local_path):
         return None
+
+    if mode == 'tarball':
+        return download_github_tarball(github_url, local_path, max_bytes=max_bytes, extensions=extensions)
+
+    if mode == 'mirror':
+        if mirror_cache.checkout(github_url, local_path) is None:
+            return None
+    else:
+        clone_kwargs = {}
+        if mode == 'shallow':
+            clone_kwargs = {'depth': 1, 'single_branch': True, 'no_tags': True}
+        try:
+            Repo.clone_from(github_url, local_path, **clone_kwargs)
+            logger.info(f"Cloned repository {github_url} to {local_path}")
+        except GitCommandError as e:
+            logger.error(f"Git command error while cloning {github_url}: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Error cloning repository {github_url}: {e}")
+            return None
+
+    # git offers no streaming hook for the cap, so check the checkout instead
+    if max_bytes and directory_size(local_path) > max_bytes:
+        logger.warning(f"Skipping repository {github_url}: checkout exceeds {max_bytes} bytes")
+        shutil.rmtree(local_path, ignore_errors=True)
+        return None
+    return local_path
+
+class _Checkout:
+    def __init__(self, workspace):
+        self.workspace = workspace
+        self.ready = threading.Event()
+        self.path = None
+        self.error = None
+        self.users = 0
+
+class SharedCheckouts:
+    """
+    Read-only checkouts shared by concurrent screenings of the same repository.
+
+    The first caller for a key fetches into a fresh workspace under root;
+    callers arriving while that checkout is still held wait for the fetch and
+    read the same tree instead of fetching again. The workspace is removed
+    when its last holder leaves. A failed fetch is handed to the callers
+    already waiting for it, but not to later ones.
+    """
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.Lock()
+        self._checkouts = {}
+
+    @contextmanager
+    def checkout(self, key, name, fetch):
+        """
+        Yield (path, shared) for key, calling fetch(local_path) to populate
+        the checkout unless another holder already did.
+
+        path is what fetch returned (None on failure) and must not be
+        modified; shared is True for callers that reuse another's fetch.
+        """
+        with self._lock:
+            checkout = self._checkouts.get(key)
+            leader = checkout is None
+            if leader:
+                os.makedirs(self.root, exist_ok=True)
+                checkout = self._checkouts[key] = _Checkout(tempfile.mkdtemp(prefix=f"{name}-", dir=self.root))
+            checkout.users += 1
+        try:
+            if leader:
+                try:
+                    checkout.path = fetch(os.path.join(checkout.workspace, name))
+                except BaseException as e:
+                    checkout.error = e
+                    raise
+                finally:
+                    if not checkout.path:
+                        with self._lock:
+                            self._forget(key, checkout)
+                    checkout.ready.set()
+            else:
+                checkout.ready.wait()
+                if checkout.error is not None:
+                    raise checkout.error
+            yield checkout.path, not leader
+        finally:
+            with self._lock:
+                checkout.users -= 1
+                last = checkout.users == 0
+                if last:
+                    self._forget(key, checkout)
+            if last:
+                shutil.rmtree(checkout.workspace, ignore_errors=True)
+
+    def _forget(self, key, checkout):
+        # Callers hold self._lock
+        if self._checkouts.get(key) is checkout:
+            del self._checkouts[key]
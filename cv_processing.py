@@ -1,88 +1,257 @@
-# cv_processing.py
-import os
-import fitz  # PyMuPDF
-from openai_interaction import extract_information_from_cv
+import asyncio
+import threading
+import multiprocessing
+from app_config import get_config
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from openai_interaction import extract_information_from_cv, extract_information_from_cv_pages
+from async_utils import run_blocking, submit_in_context
+from metrics import span
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def save_pages_as_images(pdf_bytes, output_folder="temp_images"):
-    if not os.path.exists(output_folder):
-        os.makedirs(output_folder)
+# Load configuration
+config = get_config()
 
-    image_paths = []
-    try:
-        with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
-            for page_index in range(len(doc)):
-                page = doc[page_index]
-                # Render page to an image (pixmap)
-                pix = page.get_pixmap()
-                # Define the image path
-                image_path = os.path.join(output_folder, f"page_{page_index + 1}.png")
-                # Save the image
-                pix.save(image_path)
-                image_paths.append(image_path)
-    except Exception as e:
-        logger.error(f"Error rendering PDF pages to images: {e}")
-    return image_paths
+cv_processing_config = config.get('cv_processing', {}) or {}
+render_dpi = cv_processing_config.get('dpi', 96)
+image_format = cv_processing_config.get('image_format', 'jpeg').lower()
+jpeg_quality = cv_processing_config.get('jpeg_quality', 85)
+render_workers = cv_processing_config.get('render_workers', 1)
+parallel_min_pages = cv_processing_config.get('parallel_min_pages', 4)
+extraction_mode = cv_processing_config.get('extraction_mode', 'parallel')  # sequential, parallel or batched
+extraction_workers = cv_processing_config.get('extraction_workers', 4)
+
+class CVProcessingError(Exception):
+    """Raised when a CV cannot be rendered or some of its pages cannot be extracted."""
+
+IMAGE_MIME_TYPES = {'png': 'image/png', 'jpeg': 'image/jpeg', 'jpg': 'image/jpeg'}
+
+# Created on first use and kept for the life of the process
+_render_pool = None
+_render_pool_lock = threading.Lock()
+
+def _render_page(page):
+    pix = page.get_pixmap(dpi=render_dpi)
+    if image_format in ('jpeg', 'jpg'):
+        return pix.tobytes(output='jpeg', jpg_quality=jpeg_quality)
+    return pix.tobytes(output='png')
 
-def extract_hyperlinks(pdf_bytes):
+def _page_links(page):
+    return [link.get("uri", "") for link in page.get_links() if link.get("uri", "")]
+
+def _init_render_worker(dpi, fmt, quality):
+    # Spawned workers load the default configuration; use the parent's settings
+    global render_dpi, image_format, jpeg_quality
+    render_dpi, image_format, jpeg_quality = dpi, fmt, quality
+
+def _get_render_pool():
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            # Spawned rather than forked: the parent runs threads and holds open connections
+            _render_pool = ProcessPoolExecutor(
+                max_workers=render_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_render_worker,
+                initargs=(render_dpi, image_format, jpeg_quality),
+            )
+        return _render_pool
+
+def _render_page_range(pdf_bytes, start, stop):
     """
-    Extract all hyperlinks from the PDF.
+    Render pages [start, stop) and collect their links. Runs in a worker
+    process, since PyMuPDF documents cannot be shared between threads.
     """
+    import fitz  # PyMuPDF
+
+    images = []
     hyperlinks = []
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        for page_index in range(start, stop):
+            page = doc[page_index]
+            images.append(_render_page(page))
+            hyperlinks.extend(_page_links(page))
+    return images, hyperlinks
+
+def render_pdf(pdf_bytes):
+    """
+    Render every page of the PDF to an in-memory image and extract all
+    hyperlinks in the same pass.
+
+    Returns (page_images, mime_type, hyperlinks). Pages are rendered in
+    this process unless render_workers > 1, in which case documents of at
+    least parallel_min_pages pages are split into page ranges rendered by a
+    long-lived process pool.
+    """
+    import fitz  # PyMuPDF
+
+    mime_type = IMAGE_MIME_TYPES.get(image_format, 'image/png')
     try:
         with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                links = page.get_links()
-                for link in links:
-                    uri = link.get("uri", "")
-                    if uri:
-                        hyperlinks.append(uri)
+            page_count = len(doc)
+            if page_count < parallel_min_pages or render_workers <= 1:
+                images = []
+                hyperlinks = []
+                for page in doc:
+                    images.append(_render_page(page))
+                    hyperlinks.extend(_page_links(page))
+                return images, mime_type, hyperlinks
     except Exception as e:
-        logger.error(f"Error extracting hyperlinks: {e}")
-    return hyperlinks
+        logger.error(f"Error rendering PDF pages to images: {e}")
+        return [], mime_type, []
 
-def process_cv(file_bytes, api_params):
+    workers = min(render_workers, page_count)
+    step = -(-page_count // workers)  # Ceiling division
+    ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+    images = []
+    hyperlinks = []
     try:
-        # Save pages as images
-        image_paths = save_pages_as_images(file_bytes)
+        executor = _get_render_pool()
+        futures = [executor.submit(_render_page_range, pdf_bytes, start, stop) for start, stop in ranges]
+        for future in futures:
+            range_images, range_links = future.result()
+            images.extend(range_images)
+            hyperlinks.extend(range_links)
     except Exception as e:
-        logger.error(f"Error processing PDF: {e}")
-        return {}, "", []
+        logger.error(f"Error rendering PDF pages to images: {e}")
+        return [], mime_type, []
+    return images, mime_type, hyperlinks
 
-    if not image_paths:
-        logger.error("No pages were converted to images.")
-        return {}, "", []
+def merge_extracted_info(infos):
+    """
+    Merge the extracted information of several pages without losing data.
 
-    extracted_info_list = []
-    cv_summaries = []
-    for image_path in image_paths:
+    Nested dicts are merged recursively and lists are concatenated without
+    duplicates. Differing scalar values are kept together in a list instead
+    of the later page overwriting the earlier one.
+    """
+    merged = {}
+    for info in infos:
+        if not isinstance(info, dict):
+            continue
+        for key, value in info.items():
+            if key in merged:
+                merged[key] = _merge_values(merged[key], value)
+            else:
+                merged[key] = value
+    return merged
+
+def _merge_values(existing, new):
+    if new in (None, "", [], {}):
+        return existing
+    if existing in (None, "", [], {}):
+        return new
+    if isinstance(existing, dict) and isinstance(new, dict):
+        return merge_extracted_info([existing, new])
+    existing_items = existing if isinstance(existing, list) else [existing]
+    new_items = new if isinstance(new, list) else [new]
+    merged = list(existing_items)
+    for item in new_items:
+        if item not in merged:
+            merged.append(item)
+    if len(merged) == 1 and not isinstance(existing, list) and not isinstance(new, list):
+        return merged[0]
+    return merged
+
+def extract_pages(page_images, mime_type, api_params):
+    """
+    Run vision extraction over the rendered pages according to extraction_mode.
+
+    Returns a list of (extracted_info, cv_summary) pairs in page order.
+    """
+    if extraction_mode == 'batched':
+        try:
+            return [extract_information_from_cv_pages(page_images, api_params, mime_type=mime_type)]
+        except Exception as e:
+            logger.error(f"Error extracting information from CV images: {e}")
+            return []
+
+    def extract_page(image_bytes):
         try:
             # Extract information from the CV image
-            extracted_info, cv_summary = extract_information_from_cv(image_path, api_params)
-            extracted_info_list.append(extracted_info)
-            cv_summaries.append(cv_summary)
+            return extract_information_from_cv(image_bytes, api_params, mime_type=mime_type)
         except Exception as e:
             logger.error(f"Error extracting information from CV image: {e}")
-            continue
+            return None
+
+    if extraction_mode == 'parallel' and len(page_images) > 1:
+        with ThreadPoolExecutor(max_workers=min(extraction_workers, len(page_images))) as executor:
+            futures = [submit_in_context(executor, extract_page, image_bytes) for image_bytes in page_images]
+            results = [future.result() for future in futures]
+    else:
+        results = [extract_page(image_bytes) for image_bytes in page_images]
+    return [result for result in results if result is not None]
 
+def _check_page_results(page_results, page_count):
+    # A partial extraction would silently drop parts of the CV from the screening
+    expected = 1 if extraction_mode == 'batched' else page_count
+    if len(page_results) < expected:
+        raise CVProcessingError(f"{expected - len(page_results)} of {expected} extraction requests failed")
+
+def _combine_page_results(page_results):
     # Combine extracted information and summaries from all pages
-    combined_extracted_info = {}
-    for info in extracted_info_list:
-        combined_extracted_info.update(info)
+    combined_extracted_info = merge_extracted_info(info for info, _ in page_results)
+    combined_cv_summary = " ".join(summary for _, summary in page_results if summary)
+    return combined_extracted_info, combined_cv_summary
+
+def process_cv(file_bytes, api_params):
+    """
+    Render and extract a CV; returns (extracted_info, cv_summary, hyperlinks).
+
+    Raises CVProcessingError if the PDF cannot be rendered or the extraction
+    of any page fails.
+    """
+    try:
+        # Render pages and collect hyperlinks in a single pass
+        with span('pdf_render'):
+            page_images, mime_type, hyperlinks = render_pdf(file_bytes)
+    except Exception as e:
+        logger.error(f"Error processing PDF: {e}")
+        raise CVProcessingError(f"the PDF could not be rendered: {e}") from e
+
+    if not page_images:
+        logger.error("No pages were converted to images.")
+        raise CVProcessingError("no pages were converted to images")
+
+    page_results = extract_pages(page_images, mime_type, api_params)
+    _check_page_results(page_results, len(page_images))
+    combined_extracted_info, combined_cv_summary = _combine_page_results(page_results)
+
+    return combined_extracted_info, combined_cv_summary, hyperlinks
 
-    combined_cv_summary = " ".join(cv_summaries)
+async def process_cv_async(file_bytes, api_params):
+    """
+    Async variant of process_cv. Rendering runs in the shared executor and,
+    unless extraction_mode is 'sequential', the pages' vision calls are awaited
+    concurrently.
+    """
+    try:
+        with span('pdf_render'):
+            page_images, mime_type, hyperlinks = await run_blocking(render_pdf, file_bytes)
+    except Exception as e:
+        logger.error(f"Error processing PDF: {e}")
+        raise CVProcessingError(f"the PDF could not be rendered: {e}") from e
+
+    if not page_images:
+        logger.error("No pages were converted to images.")
+        raise CVProcessingError("no pages were converted to images")
 
-    # Extract hyperlinks from the PDF
-    hyperlinks = extract_hyperlinks(file_bytes)
+    if extraction_mode == 'parallel':
+        async def extract_page(image_bytes):
+            try:
+                return await run_blocking(extract_information_from_cv, image_bytes, api_params, mime_type=mime_type)
+            except Exception as e:
+                logger.error(f"Error extracting information from CV image: {e}")
+                return None
 
-    # Clean up temporary images
-    for image_path in image_paths:
-        os.remove(image_path)
-    os.rmdir("temp_images")
+        results = await asyncio.gather(*(extract_page(image_bytes) for image_bytes in page_images))
+        page_results = [result for result in results if result is not None]
+    else:
+        page_results = await run_blocking(extract_pages, page_images, mime_type, api_params)
+    _check_page_results(page_results, len(page_images))
+    combined_extracted_info, combined_cv_summary = _combine_page_results(page_results)
 
     return combined_extracted_info, combined_cv_summary, hyperlinks
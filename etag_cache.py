@@ -0,0 +1,55 @@
+import os
+import time
+import sqlite3
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class ETagCache:
+    """
+    SQLite store of HTTP response bodies with their ETags, used to send
+    conditional requests (If-None-Match) and reuse the body on a 304.
+    """
+    def __init__(self, path='cache/etag_cache.sqlite3'):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " etag TEXT NOT NULL,"
+                " body TEXT NOT NULL,"
+                " link TEXT,"
+                " updated_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, key):
+        """
+        Return (etag, body, link) for the key, or None if nothing is stored.
+        """
+        try:
+            with self._connect() as conn:
+                return conn.execute(
+                    "SELECT etag, body, link FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"ETag cache read failed: {e}")
+            return None
+
+    def set(self, key, etag, body, link=None):
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, etag, body, link, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, etag, body, link, time.time())
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"ETag cache write failed: {e}")
@@ -0,0 +1,150 @@
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def content_digest(file_path):
+    """
+    SHA-256 of a file's content with line endings normalized, so copies that
+    only differ in CRLF/LF still match.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block.replace(b'\r\n', b'\n'))
+    return digest.hexdigest()
+
+class PersistentFileHashes:
+    """
+    SQLite record of file digests seen in earlier screenings, with the
+    repository and path they were first seen at.
+    """
+    def __init__(self, path='cache/file_hashes.sqlite3'):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS seen_files ("
+                " digest TEXT PRIMARY KEY,"
+                " owner TEXT NOT NULL,"
+                " label TEXT NOT NULL,"
+                " first_seen REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def lookup(self, digest):
+        """
+        Return the (owner, label) the digest was first sent from, or None.
+        """
+        try:
+            with self._connect() as conn:
+                return conn.execute(
+                    "SELECT owner, label FROM seen_files WHERE digest = ?", (digest,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"File hash store read failed: {e}")
+            return None
+
+    def record(self, digests, owner):
+        """
+        Record (digest, label) pairs sent from owner, keeping earlier entries.
+        """
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO seen_files (digest, owner, label, first_seen) VALUES (?, ?, ?, ?)",
+                    [(digest, owner, label, time.time()) for digest, label in digests]
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"File hash store write failed: {e}")
+
+class FileDedupStore:
+    """
+    Content-hash store of the files already fed to the LLM during one screening.
+
+    Files are looked up while a repository is read and only recorded once
+    they are known to be in its prompt, so a reference never points at
+    content that was cut by a budget. With a PersistentFileHashes store,
+    files sent from a different repository in an earlier screening count as
+    duplicates too.
+
+    Repositories are read in parallel, but resolve their duplicates in the
+    order given to set_order(): each one waits in wait_turn() only after its
+    own read, until all earlier ones have recorded their files and called
+    release(). Which copy of a shared file is sent in full thus does not
+    depend on thread scheduling, and a slow clone delays only the packing of
+    the repositories after it, not their fetching or reading.
+    """
+    def __init__(self, persistent=None, min_bytes=0):
+        self.persistent = persistent
+        self.min_bytes = min_bytes
+        self._seen = {}  # digest -> (owner, label)
+        self._order = {}  # owner -> position
+        self._released = set()
+        self._condition = threading.Condition()
+
+    def digest(self, file_path):
+        """
+        Return the file's content digest, or None if it is too small to dedup.
+        """
+        try:
+            if os.path.getsize(file_path) < self.min_bytes:
+                return None
+            return content_digest(file_path)
+        except OSError:
+            return None
+
+    def lookup(self, digest, owner):
+        """
+        Return the label of a copy already sent from another repository, or None.
+        """
+        with self._condition:
+            first = self._seen.get(digest)
+        if first is not None and first[0] != owner:
+            return first[1]
+        if self.persistent is not None:
+            first = self.persistent.lookup(digest)
+            if first is not None and first[0] != owner:
+                return first[1]
+        return None
+
+    def record(self, digests, owner):
+        """
+        Record the (digest, label) pairs owner sent in full.
+        """
+        with self._condition:
+            for digest, label in digests:
+                self._seen.setdefault(digest, (owner, label))
+        if self.persistent is not None and digests:
+            self.persistent.record(digests, owner)
+
+    def set_order(self, owners):
+        with self._condition:
+            self._order = {owner: position for position, owner in enumerate(owners)}
+
+    def wait_turn(self, owner):
+        """
+        Block until every repository ordered before owner has released.
+        """
+        with self._condition:
+            position = self._order.get(owner)
+            if position is None:
+                return
+            earlier = [other for other, other_position in self._order.items() if other_position < position]
+            self._condition.wait_for(lambda: all(other in self._released for other in earlier))
+
+    def release(self, owner):
+        with self._condition:
+            self._released.add(owner)
+            self._condition.notify_all()
@@ -1,108 +1,699 @@
 # github_analysis.py
 import os
 import re
-import requests
+import math
+import time
+import asyncio
+import json
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from urllib.parse import urlparse
-from clone_repo import clone_github_repo
-from process_files import read_code_files
-from openai_interaction import ask_question_about_code
-import shutil
+from clone_repo import clone_github_repo, get_remote_head_sha, directory_size, SharedCheckouts
+from process_files import iter_code_sections, resolve_duplicates, CHARS_PER_TOKEN, DEFAULT_EXTENSIONS
+from openai_interaction import ask_question_about_code, reduce_code_summaries, cache_allowed, models
+from chunking import chunk_sections
+from prompts import CODE_CHUNK_QUESTION
+from repo_summary_cache import RepoSummaryCache
+from etag_cache import ETagCache
+from file_dedup import FileDedupStore, PersistentFileHashes
+from mirror_cache import MirrorCache
+from static_analysis import analyze_repository, format_profile, LANGUAGES
+from async_utils import run_blocking, submit_in_context, SingleFlight
+from metrics import span, count
 import logging
-import yaml
+from app_config import get_config, endpoint_url
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Load configuration
-with open('config.yaml', 'r') as f:
-    config = yaml.safe_load(f)
+config = get_config()
+
+# Base URL of the GitHub REST API; GITHUB_API_URL overrides it (e.g. for local stand-ins)
+github_api_url = endpoint_url('github_api_url')
 
 github_analysis_config = config.get('github_analysis', {})
 max_repos = github_analysis_config.get('max_repos', None)  # Set to None to process all repositories
 max_repo_size_mb = github_analysis_config.get('max_repo_size_mb', None)  # Max size in MB
 exclude_forks = github_analysis_config.get('exclude_forks', True)
+workspace_root = github_analysis_config.get('workspace_root', 'temp_repos')
+fetch_mode = github_analysis_config.get('fetch_mode', 'full')
+max_fetch_mb = github_analysis_config.get('max_fetch_mb', max_repo_size_mb)  # Byte cap enforced while fetching
+max_fetch_bytes = int(max_fetch_mb * 1024 * 1024) if max_fetch_mb else None
+max_codebase_chars = github_analysis_config.get('max_codebase_chars', None)  # Reading stops at this budget
+
+# A local static-analysis profile replaces most of the raw code in the prompt
+static_analysis_config = config.get('static_analysis', {}) or {}
+static_analysis_enabled = static_analysis_config.get('enabled', False)
+max_profile_chars = static_analysis_config.get('max_profile_chars', 6000)
+raw_code_share = static_analysis_config.get('raw_code_share', 0.25)  # Share of the reading budget left for raw code
+# Tarball fetches keep only these files, so they must include every language the profile counts
+fetch_extensions = sorted(set(DEFAULT_EXTENSIONS) | set(LANGUAGES)) if static_analysis_enabled else DEFAULT_EXTENSIONS
+
+# Token-budgeted map-reduce summarization of large repositories
+summarization_config = config.get('summarization', {}) or {}
+max_chunk_tokens = summarization_config.get('max_chunk_tokens', 3000)
+max_repo_tokens = summarization_config.get('max_repo_tokens', 24000)  # Ceiling on code tokens summarized per repository
+map_workers = summarization_config.get('map_workers', 4)
+if max_codebase_chars is None and max_repo_tokens:
+    # Read a little more than the token ceiling needs; chunking makes the exact cut
+    max_codebase_chars = int(max_repo_tokens * CHARS_PER_TOKEN * 1.5)
+
+# Per-stage concurrency limits for the repository pipeline
+concurrency_config = github_analysis_config.get('concurrency', {}) or {}
+clone_workers = concurrency_config.get('clone_workers', 4)
+read_workers = concurrency_config.get('read_workers', 4)
+summarize_workers = concurrency_config.get('summarize_workers', 4)
+
+# Summaries of unchanged repositories are reused, keyed by remote HEAD SHA
+summary_cache_config = github_analysis_config.get('summary_cache', {}) or {}
+summary_cache = None
+if summary_cache_config.get('enabled', False):
+    summary_cache = RepoSummaryCache(summary_cache_config.get('path', 'cache/repo_summaries.sqlite3'))
+
+# With fetch_mode 'mirror', repositories are checked out from local bare mirrors
+mirror_cache_config = github_analysis_config.get('mirror_cache', {}) or {}
+mirror_cache = None
+if fetch_mode == 'mirror':
+    max_mirror_mb = mirror_cache_config.get('max_total_mb', None)
+    mirror_cache = MirrorCache(
+        mirror_cache_config.get('root', 'cache/mirrors'),
+        max_bytes=int(max_mirror_mb * 1024 * 1024) if max_mirror_mb else None
+    )
+
+# Repository listings are revalidated with ETags; a 304 does not count against the rate limit
+listing_cache_config = github_analysis_config.get('listing_cache', {}) or {}
+listing_cache = None
+if listing_cache_config.get('enabled', False):
+    listing_cache = ETagCache(listing_cache_config.get('path', 'cache/github_listings.sqlite3'))
+listing_workers = concurrency_config.get('listing_workers', 4)
+
+# Metadata-based ranking of profile repositories, applied before anything is cloned
+ranking_config = github_analysis_config.get('ranking', {}) or {}
+role_keywords = [keyword.lower() for keyword in ranking_config.get('role_keywords', [])]
+preferred_languages = [language.lower() for language in ranking_config.get('preferred_languages', [])]
+
+# Per-candidate budget shared by all repositories of one screening
+budget_config = github_analysis_config.get('budget', {}) or {}
+budget_max_seconds = budget_config.get('max_seconds', None)
+budget_max_total_mb = budget_config.get('max_total_mb', None)
+
+# Files whose content was already sent for this candidate (or, if persistent, earlier) are not sent again
+dedup_config = github_analysis_config.get('dedup', {}) or {}
+dedup_enabled = dedup_config.get('enabled', False)
+dedup_mode = dedup_config.get('mode', 'reference')
+dedup_min_bytes = dedup_config.get('min_bytes', 0)
+persistent_file_hashes = None
+if dedup_enabled and dedup_config.get('persistent', False):
+    persistent_file_hashes = PersistentFileHashes(dedup_config.get('path', 'cache/file_hashes.sqlite3'))
+
+def new_dedup_store(repos_to_process):
+    """
+    Return the dedup store for one screening's repositories, which take
+    turns in selection order, or None if dedup is disabled.
+    """
+    if not dedup_enabled:
+        return None
+    dedup = FileDedupStore(persistent_file_hashes, dedup_min_bytes)
+    dedup.set_order([repo.get('html_url', '') for _, repo in repos_to_process])
+    return dedup
+
+clone_semaphore = threading.BoundedSemaphore(clone_workers)
+read_semaphore = threading.BoundedSemaphore(read_workers)
+summarize_semaphore = threading.BoundedSemaphore(summarize_workers)
+
+# Screenings running at the same time share in-flight listings and summaries of identical prompts
+listing_flight = SingleFlight()
+summary_flight = SingleFlight()
+shared_checkouts = SharedCheckouts(workspace_root)
+
+GITHUB_HOSTS = ('github.com', 'www.github.com')
+# First path segments that are GitHub pages rather than users or organizations
+RESERVED_GITHUB_PATHS = {
+    'about', 'apps', 'collections', 'contact', 'enterprise', 'explore', 'features',
+    'login', 'marketplace', 'new', 'notifications', 'organizations', 'pricing',
+    'pulls', 'issues', 'search', 'settings', 'sponsors', 'topics', 'trending'
+}
+GITHUB_OWNER_PATTERN = re.compile(r'^[A-Za-z0-9](?:[A-Za-z0-9-]{0,38})$')
+GITHUB_REPO_PATTERN = re.compile(r'^[A-Za-z0-9._-]{1,100}$')
+
+def canonical_github_link(link):
+    """
+    Resolve a GitHub link to (owner, repo) for a repository, (owner, None)
+    for a user or organization profile, or None for anything else.
+
+    Scheme, "www.", host case, trailing slashes and punctuation, query
+    strings, a ".git" suffix and sub-pages such as /tree/main/src, /blob/...
+    or /issues are ignored, so every link to a repository resolves to the
+    same pair. The original case of the names is kept; GitHub treats them
+    case-insensitively, see github_link_key.
+    """
+    link = link.strip().rstrip('.,;:!?)]>\'"')
+    if '://' not in link:
+        link = 'https://' + link
+    parsed_url = urlparse(link)
+    if (parsed_url.hostname or '').lower() not in GITHUB_HOSTS:
+        return None
+    path_parts = [part for part in parsed_url.path.split('/') if part]
+    if not path_parts:
+        return None
+    if path_parts[0].lower() == 'orgs':
+        path_parts = path_parts[1:2]
+    if not path_parts or path_parts[0].lower() in RESERVED_GITHUB_PATHS:
+        return None
+    owner = path_parts[0]
+    if not GITHUB_OWNER_PATTERN.match(owner):
+        return None
+    if len(path_parts) == 1:
+        return owner, None
+    repo = path_parts[1]
+    if repo.lower().endswith('.git'):
+        repo = repo[:-len('.git')]
+    if not GITHUB_REPO_PATTERN.match(repo) or repo in ('.', '..'):
+        return None
+    return owner, repo
+
+def github_link_key(owner, repo=None):
+    return owner.lower(), repo.lower() if repo else None
+
+def canonical_github_url(owner, repo=None):
+    return f"https://github.com/{owner}/{repo}" if repo else f"https://github.com/{owner}"
 
 def extract_github_links(text, hyperlinks):
     """
     Extract GitHub links from both text and hyperlinks.
+
+    Every link is canonicalized, so the result holds one profile or
+    repository URL per distinct (owner, repo), in order of first appearance.
     """
     github_links = []
 
-    # Extract from text using regex
-    pattern = r'(https?://github\.com/[\w\-]+(?:/[\w\-]+)?)'
-    github_links_text = re.findall(pattern, text)
-    github_links.extend(github_links_text)
+    # Extract from text using regex; links without a scheme count too, but
+    # not the github.com tail of another host or URL (gist., docs., ...)
+    pattern = r'((?<![\w.@/-])(?:https?://)?(?:www\.)?github\.com/[^\s<>()\[\]{}"\',|]+)'
+    github_links.extend(re.findall(pattern, text, re.IGNORECASE))
 
     # Extract from hyperlinks
     for link in hyperlinks:
         if 'github.com' in link.lower():
             github_links.append(link)
 
-    # Remove duplicates
-    github_links = list(set(github_links))
+    # Remove duplicates by canonical (owner, repo)
+    canonical_links = {}
+    for link in github_links:
+        canonical = canonical_github_link(link)
+        if canonical is None:
+            logger.info(f"Ignoring GitHub link that is neither a profile nor a repository: {link}")
+            continue
+        canonical_links.setdefault(github_link_key(*canonical), canonical_github_url(*canonical))
 
-    return github_links
+    return list(canonical_links.values())
 
-def analyze_github_repos(github_links, api_params):
-    repo_summaries = []
-    for link in github_links:
-        parsed_url = urlparse(link)
-        path_parts = parsed_url.path.strip('/').split('/')
+def parse_github_link(link):
+    """
+    Split a GitHub link into [owner] or [owner, repo], or return None if it
+    is neither a profile nor a repository link.
+    """
+    canonical = canonical_github_link(link)
+    if canonical is None:
+        logger.warning(f"Invalid GitHub URL format: {link}")
+        return None
+    owner, repo = canonical
+    return [owner] if repo is None else [owner, repo]
+
+def _list_profile_repos(username):
+    with span('repo_listing'):
+        repos = get_all_user_repos(username)
+    return filter_repositories(repos)
+
+def list_profile_repos(username):
+    """
+    Return a user's filtered repositories; concurrent requests for the same
+    user share one listing.
+    """
+    repos, shared = listing_flight.do(username.lower(), _list_profile_repos, username)
+    if shared:
+        count('resume_coalesced_total', stage='repo_listing')
+    return repos
+
+def _days_since(timestamp):
+    if not timestamp:
+        return None
+    try:
+        pushed_at = datetime.strptime(timestamp, '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+    return max(0.0, (datetime.now(timezone.utc) - pushed_at).total_seconds() / 86400)
+
+def score_repository(repo):
+    """
+    Score a repository from listing metadata alone: language, stars, recency,
+    size and how well its name, description and topics match the role.
+    """
+    score = 0.0
+    language = (repo.get('language') or '').lower()
+    if language and language in preferred_languages:
+        score += 2.0
+    score += math.log1p(repo.get('stargazers_count', 0) or 0)
+
+    days = _days_since(repo.get('pushed_at'))
+    if days is not None:
+        score += 2.0 * math.exp(-days / 365)  # Recent activity counts most, decaying over about a year
+
+    size_kb = repo.get('size', 0) or 0
+    if size_kb < 10:
+        score -= 2.0  # Empty or placeholder repositories
+    else:
+        score += min(math.log10(size_kb), 4.0) / 2
+
+    text = " ".join([
+        repo.get('name') or '',
+        repo.get('description') or '',
+        " ".join(repo.get('topics') or []),
+    ]).lower().replace('-', ' ').replace('_', ' ')
+    score += 1.5 * sum(1 for keyword in role_keywords if keyword in text)
+    return score
+
+def _select_repos(parsed_links, profile_repos):
+    """
+    Combine explicit repository links and ranked profile repositories into
+    the (username, repo) pairs to analyze, capped at max_repos.
+
+    Repositories the candidate linked directly come first; profile
+    repositories fill the remaining slots in ranking order. A repository
+    reached through several links, e.g. directly and via its owner's
+    profile, is analyzed once.
+    """
+    explicit_repos = []
+    ranked_repos = []
+    for _, path_parts in parsed_links:
+        if path_parts is None:
+            continue
         if len(path_parts) == 1:
-            # User profile link; get user's repositories
             username = path_parts[0]
-            repos = get_all_user_repos(username)
-            repos = filter_repositories(repos)
-            repos_to_process = repos  # Process all filtered repositories
-        elif len(path_parts) == 2:
+            ranked_repos.extend((username, repo) for repo in profile_repos.get(username.lower(), []))
+        else:
             # Specific repository link
             username, repo_name = path_parts
-            repos_to_process = [{'name': repo_name, 'html_url': link}]
-        else:
-            logger.warning(f"Invalid GitHub URL format: {link}")
+            explicit_repos.append((username, {'name': repo_name, 'html_url': canonical_github_url(username, repo_name)}))
+
+    ranked_repos.sort(key=lambda item: score_repository(item[1]), reverse=True)
+    repos_to_process = []
+    seen = set()
+    for username, repo in explicit_repos + ranked_repos:
+        key = github_link_key(username, repo.get('name', ''))
+        if key in seen:
             continue
+        seen.add(key)
+        repos_to_process.append((username, repo))
+    if max_repos:
+        skipped = len(repos_to_process) - max_repos
+        if skipped > 0:
+            logger.info(f"Analyzing the top {max_repos} repositories; skipped {skipped} lower-ranked ones")
+        repos_to_process = repos_to_process[:max_repos]
+    return repos_to_process
 
-        for repo in repos_to_process:
-            repo_url = repo.get('html_url', '')
-            repo_name = repo.get('name', '')
-            if not repo_url or not repo_name:
-                logger.warning(f"Invalid repository data: {repo}")
-                continue
-            local_path = os.path.join('temp_repos', username, repo_name)
-            # Clone the repository
-            repo_path = clone_github_repo(repo_url, local_path=local_path)
-            if not repo_path:
-                logger.error(f"Failed to clone repository: {repo_url}")
-                continue
-            # Read code files
-            codebase_text = read_code_files(repo_path)
-            if not codebase_text:
-                logger.error(f"No code files found in repository: {repo_url}")
-                # Clean up if no code was read
-                shutil.rmtree(os.path.join('temp_repos', username), ignore_errors=True)
-                continue
-            # Ask OpenAI to generate a summary of the repository
-            summary = ask_question_about_code(
-                codebase_text,
-                f"Please provide a summary of the repository '{repo_name}' focusing on technologies used, complexity, and relevance to Document Analysis and Recognition.",
-                api_params
-            )
-            if summary:
-                repo_summaries.append({
+def _parse_links(github_links):
+    """
+    Return the parsed links and the profiles among them to list, keyed by
+    lower-cased username.
+    """
+    parsed_links = [(link, parse_github_link(link)) for link in github_links]
+    profile_names = {}
+    for _, path_parts in parsed_links:
+        if path_parts and len(path_parts) == 1:
+            # User profile link; its repositories are listed
+            profile_names.setdefault(path_parts[0].lower(), path_parts[0])
+    return parsed_links, profile_names
+
+def collect_repos(github_links):
+    """
+    Resolve GitHub links to a list of (username, repo) pairs to analyze.
+    """
+    parsed_links, profile_names = _parse_links(github_links)
+    profile_repos = {key: list_profile_repos(username) for key, username in profile_names.items()}
+    return _select_repos(parsed_links, profile_repos)
+
+class ScreeningBudget:
+    """
+    Wall-clock and byte budget shared by all repositories of one candidate.
+
+    Bytes reserved by fetches still in flight are tracked apart from the
+    bytes fetches actually used: only the latter spend the budget, and a
+    fetch that finds the rest of it reserved waits for a settle() instead
+    of giving up.
+    """
+    def __init__(self, max_seconds=None, max_bytes=None):
+        self.deadline = time.monotonic() + max_seconds if max_seconds else None
+        self.max_bytes = max_bytes
+        self.bytes_used = 0
+        self.bytes_reserved = 0
+        self._condition = threading.Condition()
+
+    @classmethod
+    def from_config(cls):
+        max_bytes = int(budget_max_total_mb * 1024 * 1024) if budget_max_total_mb else None
+        return cls(budget_max_seconds, max_bytes)
+
+    def _out_of_time(self):
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def exhausted(self):
+        if self._out_of_time():
+            return True
+        with self._condition:
+            return self.max_bytes is not None and self.bytes_used >= self.max_bytes
+
+    def reserve(self, max_bytes=None):
+        """
+        Set aside up to max_bytes of the unreserved byte budget for one fetch
+        and return the amount to cap it at: max_bytes if bytes are
+        unlimited, 0 once the budget is spent or time is up. While the rest
+        of the budget is reserved by fetches in flight, waits for one of
+        them to settle. Pass the result to settle().
+        """
+        with self._condition:
+            if self.max_bytes is None:
+                return max_bytes
+            while True:
+                if self._out_of_time() or self.bytes_used >= self.max_bytes:
+                    return 0
+                available = self.max_bytes - self.bytes_used - self.bytes_reserved
+                if available > 0:
+                    reserved = min(max_bytes, available) if max_bytes else available
+                    self.bytes_reserved += reserved
+                    return reserved
+                timeout = self.deadline - time.monotonic() if self.deadline is not None else None
+                self._condition.wait(timeout)
+
+    def settle(self, reserved, used):
+        """
+        Release a reservation and charge the bytes the fetch actually used.
+        """
+        with self._condition:
+            if self.max_bytes is not None:
+                self.bytes_reserved -= reserved
+            self.bytes_used += used
+            self._condition.notify_all()
+
+def new_screening_state(repos_to_process):
+    """
+    Return the (ScreeningBudget, dedup store) shared by one screening's repositories.
+    """
+    return ScreeningBudget.from_config(), new_dedup_store(repos_to_process)
+
+def analyze_github_repos(github_links, api_params):
+    """
+    Clone, read and summarize every repository referenced by the GitHub links.
+
+    Repositories are processed by a bounded worker pool. Each stage (clone,
+    read, summarize) is limited by its own semaphore, so a repository can be
+    summarized while others are still being cloned or read.
+    """
+    repos_to_process = collect_repos(github_links)
+    if not repos_to_process:
+        return []
+
+    budget, dedup = new_screening_state(repos_to_process)
+    max_workers = clone_workers + read_workers + summarize_workers
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='repo') as executor:
+        futures = [
+            submit_in_context(executor, analyze_repo, username, repo, api_params, budget, dedup)
+            for username, repo in repos_to_process
+        ]
+        results = [future.result() for future in futures]
+
+    return [result for result in results if result]
+
+async def collect_repos_async(github_links):
+    """
+    Async variant of collect_repos that lists all profiles concurrently.
+    """
+    parsed_links, profile_names = _parse_links(github_links)
+    listings = await asyncio.gather(*(run_blocking(list_profile_repos, username) for username in profile_names.values()))
+    return _select_repos(parsed_links, dict(zip(profile_names, listings)))
+
+async def iter_github_repos_async(github_links, api_params):
+    """
+    Async variant of analyze_github_repos that yields each summary as soon
+    as it is ready instead of waiting for all of them.
+
+    Each repository runs on the shared executor; the per-stage semaphores
+    still bound clones, reads and LLM calls across every screening in the
+    process.
+    """
+    repos_to_process = await collect_repos_async(github_links)
+    budget, dedup = new_screening_state(repos_to_process)
+    tasks = [
+        asyncio.ensure_future(run_blocking(analyze_repo, username, repo, api_params, budget, dedup))
+        for username, repo in repos_to_process
+    ]
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            result = await next_result
+            if result:
+                yield result
+    finally:
+        for task in tasks:
+            task.cancel()
+
+def analyze_repo(username, repo, api_params, budget=None, dedup=None):
+    """
+    Run the clone, read and summarize stages for a single repository.
+
+    Concurrent calls for the same repository and fetch mode share one
+    read-only checkout, fetched once and removed when the last of them
+    returns; each still charges the checkout's size to its own budget. When a
+    ScreeningBudget is given, the repository is skipped once the candidate's
+    time or byte budget is spent. A FileDedupStore shared by the candidate's
+    repositories keeps duplicated files from being summarized twice; a
+    summary built with such references is not stored in the summary cache,
+    since it depends on the candidate's other repositories. The final LLM
+    summary is shared with concurrent screenings only when their prompts are
+    identical.
+    """
+    try:
+        return _analyze_repo(username, repo, api_params, budget, dedup)
+    finally:
+        # Let the screening's next repository read, however this one ended
+        if dedup is not None:
+            dedup.release(repo.get('html_url', ''))
+
+def _analyze_repo(username, repo, api_params, budget=None, dedup=None):
+    repo_url = repo.get('html_url', '')
+    repo_name = repo.get('name', '')
+    if not repo_url or not repo_name:
+        logger.warning(f"Invalid repository data: {repo}")
+        return None
+
+    question = f"Please provide a summary of the repository '{repo_name}' focusing on technologies used, complexity, and relevance to Document Analysis and Recognition."
+
+    # Reuse the stored summary if the repository has not changed since
+    head_sha = None
+    use_summary_cache = summary_cache is not None and cache_allowed(api_params)
+    fingerprint = (
+        f"{models['language_model']}:{max_codebase_chars}:{max_chunk_tokens}:{max_repo_tokens}:"
+        f"{static_analysis_enabled}:{raw_code_share}:{question}:"
+        f"{api_params.get('temperature', 0)}:{api_params.get('max_tokens', 500)}:{api_params.get('n', 1)}"
+    )
+    if use_summary_cache:
+        head_sha = get_remote_head_sha(repo_url)
+        if head_sha:
+            cached_summary = summary_cache.get(repo_url, head_sha, fingerprint)
+            if cached_summary:
+                logger.info(f"Using cached summary for {repo_url} at {head_sha[:7]}")
+                return {
                     'repo_name': repo_name,
                     'repo_url': repo_url,
-                    'summary': summary
-                })
+                    'summary': cached_summary
+                }
+
+    if budget is not None and budget.exhausted():
+        logger.info(f"Screening budget exhausted; skipping {repo_url}")
+        return None
+
+    # Reserve bytes before waiting for a fetch, so waiting for the
+    # screening's other fetches to settle does not hold up other screenings
+    fetch_bytes = max_fetch_bytes
+    if budget is not None:
+        fetch_bytes = budget.reserve(max_fetch_bytes)
+        if fetch_bytes == 0:
+            logger.info(f"Screening budget exhausted; skipping {repo_url}")
+            return None
+
+    def fetch(local_path):
+        # The shared tree is capped by max_fetch_bytes rather than this
+        # screening's reservation, so it is the same whoever fetches it
+        with clone_semaphore, span('clone'):
+            return clone_github_repo(
+                repo_url,
+                local_path=local_path,
+                mode=fetch_mode,
+                max_bytes=max_fetch_bytes,
+                extensions=fetch_extensions,
+                mirror_cache=mirror_cache
+            )
+
+    settled = False
+    try:
+        # Screenings that need the repository at the same time read one checkout
+        with shared_checkouts.checkout((repo_url.lower(), fetch_mode), repo_name, fetch) as (repo_path, shared):
+            cloned_bytes = directory_size(repo_path) if repo_path else 0
+            if budget is not None:
+                if cloned_bytes > fetch_bytes:
+                    logger.info(f"Repository {repo_url} exceeds the screening's remaining budget; skipping")
+                    repo_path = None
+                    cloned_bytes = fetch_bytes
+                budget.settle(fetch_bytes, cloned_bytes)
+                settled = True
+            if not repo_path:
+                logger.error(f"Failed to clone repository: {repo_url}")
+                return None
+            if shared:
+                count('resume_coalesced_total', stage='fetch')
             else:
+                count('resume_bytes_cloned_total', cloned_bytes)
+            # Read code files, led by the static-analysis profile when enabled
+            profile_text = None
+            code_chars = max_codebase_chars
+            if static_analysis_enabled:
+                with read_semaphore, span('static_analysis'):
+                    profile_text = format_profile(analyze_repository(repo_path), max_profile_chars)
+                if code_chars:
+                    code_chars = int(code_chars * raw_code_share)
+            with read_semaphore, span('file_read'):
+                code_sections = list(iter_code_sections(repo_path, max_chars=code_chars, dedup=dedup))
+            if dedup is not None:
+                # Repositories read in parallel but settle duplicates in selection
+                # order, once every earlier one has packed its prompt
+                dedup.wait_turn(repo_url)
+            code_sections = resolve_duplicates(code_sections, dedup, repo_url, repo_name, dedup_mode)
+            deduplicated = any(duplicate_of for _, _, duplicate_of in code_sections)
+            code_sections = [(section, record) for section, record, _ in code_sections if section]
+            sections = [section for section, _ in code_sections]
+            count('resume_bytes_read_total', sum(len(section.encode('utf-8')) for section in sections))
+            if not sections:
+                logger.error(f"No code files found in repository: {repo_url}")
+                return None
+            offset = 0
+            if profile_text:
+                sections.insert(0, profile_text + "\n")
+                offset = 1
+            if budget is not None and budget.deadline is not None and time.monotonic() >= budget.deadline:
+                logger.info(f"Screening time budget exhausted; skipping summary of {repo_url}")
+                return None
+            packed = []
+            chunks = chunk_sections(sections, max_chunk_tokens, max_repo_tokens, models['language_model'], packed=packed)
+            if dedup is not None:
+                # Only files that made it into the prompt in full can be referenced later
+                records = [code_sections[index - offset][1] for index in packed if index >= offset]
+                dedup.record([record for record in records if record], repo_url)
+                dedup.release(repo_url)
+            # Ask OpenAI to generate a summary of the repository; screenings that
+            # built the identical prompt meanwhile share one in-flight summary
+            summary_key = hashlib.sha256(
+                json.dumps([chunks, repo_name, question, api_params], sort_keys=True).encode('utf-8')
+            ).hexdigest()
+            summary, shared = summary_flight.do(summary_key, summarize_chunks, chunks, repo_name, question, api_params)
+            if shared:
+                count('resume_coalesced_total', stage='repo_summary')
+            if not summary:
                 logger.error(f"Failed to generate summary for repository: {repo_url}")
-            # Clean up cloned repository after analysis
-            shutil.rmtree(os.path.join('temp_repos', username), ignore_errors=True)
-    return repo_summaries
+                return None
+            if use_summary_cache and head_sha and not deduplicated:
+                summary_cache.set(repo_url, head_sha, summary, fingerprint)
+            return {
+                'repo_name': repo_name,
+                'repo_url': repo_url,
+                'summary': summary
+            }
+    except Exception as e:
+        logger.error(f"Error analyzing repository {repo_url}: {e}")
+        return None
+    finally:
+        if budget is not None and not settled:
+            budget.settle(fetch_bytes, 0)
+
+def summarize_chunks(chunks, repo_name, question, api_params):
+    """
+    Summarize a repository's packed chunks. A single chunk is answered
+    directly; otherwise chunk summaries are generated concurrently and then
+    reduced into the final answer. Every LLM call holds the summarize
+    semaphore.
+    """
+    if not chunks:
+        return ""
+    if len(chunks) == 1:
+        with summarize_semaphore:
+            return ask_question_about_code(chunks[0], question, api_params)
+
+    def summarize_chunk(index_chunk):
+        index, chunk = index_chunk
+        with summarize_semaphore:
+            return ask_question_about_code(chunk, CODE_CHUNK_QUESTION(repo_name, index, len(chunks)), api_params)
+
+    with ThreadPoolExecutor(max_workers=min(map_workers, len(chunks))) as executor:
+        futures = [submit_in_context(executor, summarize_chunk, index_chunk) for index_chunk in enumerate(chunks, start=1)]
+        chunk_summaries = [future.result() for future in futures]
+    chunk_summaries = [chunk_summary for chunk_summary in chunk_summaries if chunk_summary]
+    if not chunk_summaries:
+        return ""
+    with summarize_semaphore:
+        return reduce_code_summaries(chunk_summaries, question, api_params)
+
+def _last_page(link_header):
+    """
+    Return the page number of the rel="last" entry of a GitHub Link header.
+    """
+    if not link_header:
+        return None
+    match = re.search(r'<[^>]*[?&]page=(\d+)[^>]*>;\s*rel="last"', link_header)
+    return int(match.group(1)) if match else None
+
+def fetch_repos_page(username, page, headers, per_page=100):
+    """
+    Fetch one page of a user's repositories.
+
+    Returns (page_repos, last_page), or (None, None) if the user does not
+    exist. Cached pages are revalidated with If-None-Match and served from the
+    cache on a 304.
+    """
+    import http_client
+
+    url = f'{github_api_url}/users/{username}/repos'
+    params = {
+        'per_page': per_page,
+        'page': page,
+        'type': 'owner',  # Only repositories owned by the user
+        'sort': 'updated',  # Sort by last updated
+        'direction': 'desc'
+    }
+    cache_key = f"{url}?per_page={per_page}&page={page}&type=owner&sort=updated&direction=desc"
+    cached = listing_cache.get(cache_key) if listing_cache is not None else None
+    request_headers = dict(headers)
+    if cached:
+        request_headers['If-None-Match'] = cached[0]
+
+    response = http_client.get(url, headers=request_headers, params=params)
+    if response.status_code == 404:
+        return None, None
+    if response.status_code == 304 and cached:
+        _, body, link = cached
+        return json.loads(body), _last_page(link)
+    response.raise_for_status()
+
+    link = response.headers.get('Link')
+    etag = response.headers.get('ETag')
+    if listing_cache is not None and etag:
+        listing_cache.set(cache_key, etag, response.text, link)
+    return response.json(), _last_page(link)
 
 def get_all_user_repos(username):
-    repos = []
-    page = 1
+    import requests
+
     per_page = 100  # Maximum allowed by GitHub API
 
     # Load GitHub access token from environment variables
@@ -113,29 +704,46 @@ def get_all_user_repos(username):
     else:
         logger.warning("No GitHub access token found. API rate limits may be low.")
 
-    while True:
-        url = f'https://api.github.com/users/{username}/repos'
-        params = {
-            'per_page': per_page,
-            'page': page,
-            'type': 'owner',  # Only repositories owned by the user
-            'sort': 'updated',  # Sort by last updated
-            'direction': 'desc'
-        }
+    try:
+        repos, last_page = fetch_repos_page(username, 1, headers, per_page)
+    except requests.RequestException as e:
+        logger.error(f"Failed to fetch repositories for {username}: {e}")
+        return []
+    if repos is None:
+        logger.error(f"User {username} not found.")
+        return []
+
+    if last_page and last_page > 1:
+        # The Link header tells us how many pages there are; fetch the rest concurrently
+        with ThreadPoolExecutor(max_workers=min(listing_workers, last_page - 1)) as executor:
+            futures = [
+                executor.submit(fetch_repos_page, username, page, headers, per_page)
+                for page in range(2, last_page + 1)
+            ]
+            for future in futures:
+                try:
+                    page_repos, _ = future.result()
+                except requests.RequestException as e:
+                    logger.error(f"Failed to fetch repositories for {username}: {e}")
+                    break
+                if not page_repos:
+                    break
+                repos.extend(page_repos)
+        return repos
+
+    # Without a Link header, keep paging until a short or empty page
+    page = 1
+    page_repos = repos
+    while len(page_repos) >= per_page:
+        page += 1
         try:
-            response = requests.get(url, headers=headers, params=params)
-            if response.status_code == 404:
-                logger.error(f"User {username} not found.")
-                break
-            response.raise_for_status()
-            page_repos = response.json()
-            if not page_repos:
-                break
-            repos.extend(page_repos)
-            page += 1
+            page_repos, _ = fetch_repos_page(username, page, headers, per_page)
         except requests.RequestException as e:
             logger.error(f"Failed to fetch repositories for {username}: {e}")
             break
+        if not page_repos:
+            break
+        repos.extend(page_repos)
     return repos
 
 def filter_repositories(repos):
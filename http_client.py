@@ -0,0 +1,174 @@
+import time
+import random
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+from app_config import get_config
+from requests.adapters import HTTPAdapter
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Load configuration
+config = get_config()
+
+http_config = config.get('http', {}) or {}
+default_timeout = http_config.get('timeout', 60)
+max_retries = http_config.get('max_retries', 5)
+backoff_factor = http_config.get('backoff_factor', 1.0)
+max_backoff = http_config.get('max_backoff', 60)
+max_rate_limit_wait = http_config.get('max_rate_limit_wait', 300)
+pool_maxsize = http_config.get('pool_maxsize', 20)
+host_configs = http_config.get('hosts', {}) or {}
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class RateLimitExceeded(requests.RequestException):
+    """Raised when a host's quota resets later than max_rate_limit_wait."""
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled at `rate` tokens per second, holding
+    at most `capacity` tokens.
+    """
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class _HostLimits:
+    def __init__(self, host_config):
+        self.semaphore = threading.BoundedSemaphore(host_config.get('max_concurrency', 8))
+        rate = host_config.get('rate_per_second')
+        self.bucket = TokenBucket(rate, host_config.get('burst', max(1, rate))) if rate else None
+        # Set when the server reports an exhausted quota, e.g. GitHub's X-RateLimit-Remaining: 0
+        self.blocked_until = 0.0
+
+_session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=len(host_configs) or 10, pool_maxsize=pool_maxsize)
+_session.mount('https://', _adapter)
+_session.mount('http://', _adapter)
+
+_host_limits = {}
+_host_limits_lock = threading.Lock()
+
+def _limits_for(host):
+    with _host_limits_lock:
+        if host not in _host_limits:
+            _host_limits[host] = _HostLimits(host_configs.get(host, {}) or {})
+        return _host_limits[host]
+
+def _parse_retry_after(value):
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def _rate_limit_reset_delay(response):
+    """
+    Seconds until GitHub's rate-limit window resets, if the quota is exhausted.
+    """
+    if response.headers.get('X-RateLimit-Remaining') != '0':
+        return None
+    reset = response.headers.get('X-RateLimit-Reset')
+    if not reset:
+        return None
+    try:
+        return max(0.0, float(reset) - time.time())
+    except ValueError:
+        return None
+
+def _backoff_delay(attempt):
+    delay = backoff_factor * (2 ** attempt)
+    return min(max_backoff, delay + random.uniform(0, delay / 2))
+
+def _should_retry(response):
+    if response.status_code in RETRY_STATUS_CODES:
+        return True
+    # GitHub answers 403 rather than 429 when the primary rate limit is exhausted
+    return response.status_code == 403 and response.headers.get('X-RateLimit-Remaining') == '0'
+
+def request(method, url, **kwargs):
+    """
+    Send a request through the shared, pooled session.
+
+    Requests are limited per host by a concurrency cap and a token bucket.
+    Connection errors, 429s, 5xx responses and exhausted GitHub quotas are
+    retried with exponential backoff, honouring Retry-After and
+    X-RateLimit-Reset. The last response is returned once retries run out;
+    connection errors are re-raised.
+    """
+    kwargs.setdefault('timeout', default_timeout)
+    limits = _limits_for(urlparse(url).netloc)
+
+    attempt = 0
+    while True:
+        wait = limits.blocked_until - time.time()
+        if wait > max_rate_limit_wait:
+            raise RateLimitExceeded(f"Rate limit for {urlparse(url).netloc} resets in {wait:.0f}s")
+        if wait > 0:
+            logger.info(f"Rate limit exhausted for {urlparse(url).netloc}; waiting {wait:.1f}s")
+            time.sleep(wait)
+            continue
+        if limits.bucket is not None:
+            limits.bucket.acquire()
+
+        try:
+            with limits.semaphore:
+                response = _session.request(method, url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt >= max_retries:
+                raise
+            delay = _backoff_delay(attempt)
+            logger.warning(f"{method} {url} failed ({e}); retrying in {delay:.1f}s")
+            time.sleep(delay)
+            attempt += 1
+            continue
+
+        reset_delay = _rate_limit_reset_delay(response)
+        if reset_delay is not None:
+            limits.blocked_until = time.time() + reset_delay
+
+        if not _should_retry(response) or attempt >= max_retries:
+            return response
+        if reset_delay is not None and reset_delay > max_rate_limit_wait:
+            return response
+
+        delay = _parse_retry_after(response.headers.get('Retry-After'))
+        if delay is None:
+            delay = reset_delay if reset_delay is not None else _backoff_delay(attempt)
+        delay = min(delay, max_backoff)
+        logger.warning(f"{method} {url} returned {response.status_code}; retrying in {delay:.1f}s")
+        response.close()
+        time.sleep(delay)
+        attempt += 1
+
+def get(url, **kwargs):
+    return request('GET', url, **kwargs)
+
+def post(url, **kwargs):
+    return request('POST', url, **kwargs)
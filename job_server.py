@@ -0,0 +1,298 @@
+"""
+Background job server for CV screenings.
+
+    python job_server.py --port 8080 --workers 4
+
+API:
+
+- POST /jobs with a PDF body (Content-Type: application/pdf) and optional
+  ?temperature=&max_tokens= query parameters, or a JSON body
+  {"cv_path": ..., "api_params": {...}} naming a file already in the
+  upload directory. Only the api_params in CLIENT_API_PARAMS are accepted.
+  Answers 202 with {"job_id": ...}, or 400 on invalid input.
+- GET /jobs/<id> returns the job's status and, once done, its report.
+- GET /jobs/<id>/events streams progress as server-sent events until the
+  job finishes.
+- GET /stats returns the number of jobs per status.
+
+Jobs run in a pool of supervised worker processes and are persisted in
+SQLite, so neither a crashed worker nor a restart loses work.
+"""
+import os
+import json
+import time
+import uuid
+import asyncio
+import argparse
+import logging
+import threading
+import multiprocessing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from app_config import get_config, set_config_path
+from job_store import JobStore, DONE, FAILED
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# api_params a client may set, with their type and allowed range
+CLIENT_API_PARAMS = {
+    'temperature': (float, 0.0, 2.0),
+    'max_tokens': (int, 1, 16384),
+    'bypass_cache': (bool, None, None),
+    'timing_breakdown': (bool, None, None),
+}
+
+def _job_server_config():
+    return get_config().get('job_server', {}) or {}
+
+def parse_api_params(values):
+    """
+    Validate client-supplied api_params and return them converted to their
+    types. Raises ValueError on unknown keys or out-of-range values.
+    """
+    params = {}
+    for key, value in values.items():
+        if key not in CLIENT_API_PARAMS:
+            raise ValueError(f"unsupported api_params key: {key}")
+        kind, low, high = CLIENT_API_PARAMS[key]
+        if kind is bool:
+            if isinstance(value, str) and value.lower() in ('true', 'false'):
+                value = value.lower() == 'true'
+            if not isinstance(value, bool):
+                raise ValueError(f"{key} must be true or false")
+            params[key] = value
+            continue
+        if isinstance(value, bool):
+            raise ValueError(f"{key} must be a number")
+        try:
+            value = kind(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{key} must be a number") from None
+        if value != value or not low <= value <= high:
+            raise ValueError(f"{key} must be between {low} and {high}")
+        params[key] = value
+    return params
+
+def resolve_upload(upload_dir, cv_path):
+    """
+    Return the real path of cv_path if it is a file inside upload_dir, else None.
+    """
+    root = os.path.realpath(upload_dir)
+    path = os.path.realpath(os.path.join(root, cv_path))
+    if os.path.commonpath([root, path]) != root or not os.path.isfile(path):
+        return None
+    return path
+
+def run_job(store, job):
+    from backend import process_resume_async
+
+    def record_event(event, data):
+        store.add_event(job['id'], event, data)
+
+    try:
+        report = asyncio.run(process_resume_async(job['cv_path'], job['api_params'], on_event=record_event))
+        store.finish(job['id'], report)
+        logger.info(f"Job {job['id']} finished")
+    except Exception as e:
+        logger.error(f"Job {job['id']} failed: {e}")
+        store.fail(job['id'], str(e))
+
+def worker_loop(db_path, config_path=None, poll_interval=1.0):
+    """
+    Claim and run queued jobs until the process is terminated.
+    """
+    if config_path:
+        set_config_path(config_path)
+    store = JobStore(db_path)
+    logger.info(f"Worker {os.getpid()} started")
+    while True:
+        job = store.claim_next(os.getpid())
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+        run_job(store, job)
+
+def make_handler(store, upload_dir, default_api_params):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+        def _send_json(self, status, body):
+            payload = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_POST(self):
+            parsed = urlparse(self.path)
+            if parsed.path != '/jobs':
+                self._send_json(404, {'error': 'not found'})
+                return
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length)
+            api_params = dict(default_api_params)
+            content_type = self.headers.get('Content-Type', '')
+
+            if content_type.startswith('application/json'):
+                try:
+                    request = json.loads(body or b'{}')
+                except json.JSONDecodeError:
+                    self._send_json(400, {'error': 'invalid JSON'})
+                    return
+                if not isinstance(request, dict):
+                    self._send_json(400, {'error': 'expected a JSON object'})
+                    return
+                cv_path = request.get('cv_path')
+                cv_path = resolve_upload(upload_dir, cv_path) if isinstance(cv_path, str) and cv_path else None
+                if cv_path is None:
+                    self._send_json(400, {'error': 'cv_path must name an existing file in the upload directory'})
+                    return
+                client_params = request.get('api_params') or {}
+                if not isinstance(client_params, dict):
+                    self._send_json(400, {'error': 'api_params must be an object'})
+                    return
+            else:
+                if not body.startswith(b'%PDF'):
+                    self._send_json(400, {'error': 'expected a PDF body'})
+                    return
+                query = parse_qs(parsed.query)
+                client_params = {key: query[key][0] for key in ('temperature', 'max_tokens') if key in query}
+                cv_path = None
+
+            try:
+                api_params.update(parse_api_params(client_params))
+            except ValueError as e:
+                self._send_json(400, {'error': str(e)})
+                return
+            if cv_path is None:
+                os.makedirs(upload_dir, exist_ok=True)
+                cv_path = os.path.join(upload_dir, f"{uuid.uuid4().hex}.pdf")
+                with open(cv_path, 'wb') as f:
+                    f.write(body)
+
+            job_id = store.submit(os.path.abspath(cv_path), api_params)
+            self._send_json(202, {'job_id': job_id, 'status_url': f"/jobs/{job_id}"})
+
+        def do_GET(self):
+            parts = urlparse(self.path).path.strip('/').split('/')
+            if parts == ['stats']:
+                self._send_json(200, store.counts())
+            elif len(parts) == 2 and parts[0] == 'jobs':
+                job = store.get(parts[1])
+                if job is None:
+                    self._send_json(404, {'error': 'unknown job'})
+                    return
+                self._send_json(200, job)
+            elif len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'events':
+                self._stream_events(parts[1])
+            else:
+                self._send_json(404, {'error': 'not found'})
+
+        def _stream_events(self, job_id):
+            if store.get(job_id) is None:
+                self._send_json(404, {'error': 'unknown job'})
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            last_seq = 0
+            try:
+                while True:
+                    job = store.get(job_id)
+                    for event in store.events_since(job_id, last_seq):
+                        last_seq = event['seq']
+                        self.wfile.write(f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n".encode('utf-8'))
+                    if job['status'] in (DONE, FAILED):
+                        status = {'status': job['status'], 'error': job['error']}
+                        self.wfile.write(f"event: status\ndata: {json.dumps(status)}\n\n".encode('utf-8'))
+                        self.wfile.flush()
+                        return
+                    self.wfile.flush()
+                    time.sleep(0.5)
+            except (BrokenPipeError, ConnectionResetError):
+                return
+
+    return Handler
+
+def supervise(processes, start_worker, store, max_attempts, stop, interval=5.0):
+    """
+    Replace worker processes that died, queueing their running jobs again,
+    until stop is set.
+    """
+    while not stop.wait(interval):
+        for index, process in enumerate(processes):
+            if process.is_alive():
+                continue
+            requeued = store.requeue_interrupted(max_attempts, worker_pid=process.pid)
+            logger.warning(
+                f"Worker {process.pid} exited with code {process.exitcode}; "
+                f"requeued {requeued} of its jobs and starting a replacement"
+            )
+            processes[index] = start_worker()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the background CV screening job server.")
+    parser.add_argument('--config', help="Path to config.yaml")
+    parser.add_argument('--host', default=None)
+    parser.add_argument('--port', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=None, help="Number of worker processes")
+    args = parser.parse_args(argv)
+
+    if args.config:
+        set_config_path(args.config)
+    server_config = _job_server_config()
+    host = args.host or server_config.get('host', '127.0.0.1')
+    port = args.port or server_config.get('port', 8080)
+    workers = args.workers or server_config.get('workers', 2)
+    db_path = server_config.get('db_path', 'jobs/jobs.sqlite3')
+    upload_dir = server_config.get('upload_dir', 'jobs/uploads')
+
+    max_attempts = server_config.get('max_attempts', 3)
+
+    store = JobStore(db_path)
+    requeued = store.requeue_interrupted(max_attempts)
+    if requeued:
+        logger.info(f"Requeued {requeued} interrupted jobs")
+
+    # Spawned workers do not inherit the server's threads or open connections
+    context = multiprocessing.get_context('spawn')
+
+    def start_worker():
+        process = context.Process(target=worker_loop, args=(db_path, args.config), daemon=True)
+        process.start()
+        return process
+
+    processes = [start_worker() for _ in range(workers)]
+    stop = threading.Event()
+    supervisor = threading.Thread(
+        target=supervise, args=(processes, start_worker, store, max_attempts, stop), daemon=True
+    )
+    supervisor.start()
+
+    api_config = get_config().get('api_params', {})
+    default_api_params = {
+        'temperature': api_config.get('temperature', 0.7),
+        'max_tokens': api_config.get('max_tokens', 1500),
+        'n': api_config.get('n', 1),
+    }
+    server = ThreadingHTTPServer((host, port), make_handler(store, upload_dir, default_api_params))
+    logger.info(f"Job server listening on http://{host}:{port} with {workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        stop.set()
+        supervisor.join()
+        for process in processes:
+            process.terminate()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+class JobStore:
+    """
+    SQLite-backed queue of screening jobs, their progress events and results.
+
+    Every state change is committed immediately, so a restarted server picks
+    up where it stopped: queued jobs stay queued and jobs that were running
+    when the process died are queued again by requeue_interrupted().
+    """
+    def __init__(self, path='jobs/jobs.sqlite3'):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY,"
+                " status TEXT NOT NULL,"
+                " cv_path TEXT NOT NULL,"
+                " api_params TEXT NOT NULL,"
+                " report TEXT,"
+                " error TEXT,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " worker_pid INTEGER,"
+                " created_at REAL NOT NULL,"
+                " started_at REAL,"
+                " finished_at REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS job_events ("
+                " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " job_id TEXT NOT NULL,"
+                " event TEXT NOT NULL,"
+                " data TEXT NOT NULL,"
+                " created_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS job_events_job ON job_events (job_id, seq)")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def submit(self, cv_path, api_params):
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, cv_path, api_params, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, QUEUED, cv_path, json.dumps(api_params), time.time())
+            )
+        return job_id
+
+    def claim_next(self, worker_pid=None):
+        """
+        Atomically mark the oldest queued job as running on worker_pid and
+        return it, or None.
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, started_at = ?, worker_pid = ?, attempts = attempts + 1 WHERE id = ?",
+                (RUNNING, time.time(), worker_pid, row['id'])
+            )
+            conn.execute("COMMIT")
+            job = dict(row)
+            job['api_params'] = json.loads(job['api_params'])
+            return job
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def add_event(self, job_id, event, data):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO job_events (job_id, event, data, created_at) VALUES (?, ?, ?, ?)",
+                (job_id, event, json.dumps(data), time.time())
+            )
+
+    def events_since(self, job_id, after_seq=0):
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT seq, event, data FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq",
+                (job_id, after_seq)
+            ).fetchall()
+        return [{'seq': row['seq'], 'event': row['event'], 'data': json.loads(row['data'])} for row in rows]
+
+    def finish(self, job_id, report):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, report = ?, finished_at = ? WHERE id = ?",
+                (DONE, report, time.time(), job_id)
+            )
+
+    def fail(self, job_id, error):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                (FAILED, error, time.time(), job_id)
+            )
+
+    def get(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job['api_params'] = json.loads(job['api_params'])
+        return job
+
+    def requeue_interrupted(self, max_attempts=3, worker_pid=None):
+        """
+        Queue jobs left running by a crashed worker again, failing those that
+        already used up max_attempts. Only the jobs of worker_pid are touched
+        when it is given, all running jobs otherwise. Returns the number of
+        requeued jobs.
+        """
+        condition, args = "status = ?", (RUNNING,)
+        if worker_pid is not None:
+            condition, args = "status = ? AND worker_pid = ?", (RUNNING, worker_pid)
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = 'Interrupted too many times', finished_at = ?"
+                f" WHERE {condition} AND attempts >= ?",
+                (FAILED, time.time()) + args + (max_attempts,)
+            )
+            cursor = conn.execute(
+                f"UPDATE jobs SET status = ?, started_at = NULL, worker_pid = NULL WHERE {condition}",
+                (QUEUED,) + args
+            )
+            return cursor.rowcount
+
+    def counts(self):
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS count FROM jobs GROUP BY status").fetchall()
+        return {row['status']: row['count'] for row in rows}
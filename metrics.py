@@ -0,0 +1,184 @@
+import time
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for index, upper in enumerate(self.buckets):
+            if value <= upper:
+                self.counts[index] += 1
+        self.total += value
+        self.count += 1
+
+class MetricsRegistry:
+    """
+    Process-wide counters and duration histograms, rendered in the Prometheus
+    text exposition format.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}  # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> _Histogram
+        self._help = {}
+
+    def describe(self, name, help_text):
+        self._help[name] = help_text
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            if key not in self._histograms:
+                self._histograms[key] = _Histogram(DURATION_BUCKETS)
+            self._histograms[key].observe(value)
+
+    @staticmethod
+    def _format_labels(labels, extra=()):
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{key}="{value}"' for key, value in pairs) + "}"
+
+    def render(self):
+        lines = []
+        with self._lock:
+            counter_names = sorted({name for name, _ in self._counters})
+            for name in counter_names:
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for (counter_name, labels), value in sorted(self._counters.items()):
+                    if counter_name == name:
+                        lines.append(f"{name}{self._format_labels(labels)} {value}")
+
+            histogram_names = sorted({name for name, _ in self._histograms})
+            for name in histogram_names:
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for (histogram_name, labels), histogram in sorted(self._histograms.items(), key=lambda item: item[0]):
+                    if histogram_name != name:
+                        continue
+                    for upper, count in zip(histogram.buckets, histogram.counts):
+                        lines.append(f"{name}_bucket{self._format_labels(labels, [('le', upper)])} {count}")
+                    lines.append(f"{name}_bucket{self._format_labels(labels, [('le', '+Inf')])} {histogram.count}")
+                    lines.append(f"{name}_sum{self._format_labels(labels)} {histogram.total}")
+                    lines.append(f"{name}_count{self._format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+registry.describe('resume_stage_duration_seconds', "Duration of pipeline stages.")
+registry.describe('resume_llm_tokens_total', "Tokens reported by the API usage field.")
+registry.describe('resume_llm_cache_hits_total', "Chat completions served from the LLM cache.")
+registry.describe('resume_bytes_cloned_total', "Bytes of repository content fetched to disk.")
+registry.describe('resume_bytes_read_total', "Bytes of code read for summarization.")
+
+class ScreeningBreakdown:
+    """
+    Timings and counters collected for a single screening.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages = {}  # stage -> [count, total_seconds]
+        self.counters = {}
+
+    def add_timing(self, stage, seconds):
+        with self._lock:
+            entry = self.stages.setdefault(stage, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def add_count(self, name, value):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def to_markdown(self):
+        lines = ["| Stage | Calls | Total (s) |", "|---|---|---|"]
+        with self._lock:
+            for stage, (count, total) in self.stages.items():
+                lines.append(f"| {stage} | {count} | {total:.2f} |")
+            counter_lines = [f"- **{name}:** {value}" for name, value in sorted(self.counters.items())]
+        return "\n".join(lines + [""] + counter_lines)
+
+# The breakdown of the screening running in the current context, if any
+current_breakdown = contextvars.ContextVar('current_breakdown', default=None)
+
+@contextmanager
+def span(stage):
+    """
+    Time a pipeline stage, recording it in the registry and in the current
+    screening's breakdown.
+    """
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started_at
+        registry.observe('resume_stage_duration_seconds', elapsed, stage=stage)
+        breakdown = current_breakdown.get()
+        if breakdown is not None:
+            breakdown.add_timing(stage, elapsed)
+
+def count(name, value=1, **labels):
+    """
+    Increment a counter in the registry and in the current screening's breakdown.
+    """
+    registry.inc(name, value, **labels)
+    breakdown = current_breakdown.get()
+    if breakdown is not None:
+        suffix = ",".join(str(labels[key]) for key in sorted(labels))
+        breakdown.add_count(f"{name}[{suffix}]" if suffix else name, value)
+
+def record_usage(model, usage):
+    """
+    Count the tokens of an API response's `usage` field.
+    """
+    if not usage:
+        return
+    for token_type in ('prompt_tokens', 'completion_tokens'):
+        if usage.get(token_type):
+            count('resume_llm_tokens_total', usage[token_type], model=model, type=token_type.replace('_tokens', ''))
+
+def start_metrics_server(port, host='0.0.0.0'):
+    """
+    Serve the registry at /metrics in a background thread.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = registry.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,213 @@
+import os
+import shutil
+import logging
+import threading
+from contextlib import contextmanager
+
+from clone_repo import parse_owner_repo, directory_size
+
+try:
+    import fcntl
+except ImportError:  # Not POSIX; mirrors are then only locked within this process
+    fcntl = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class MirrorCache:
+    """
+    Local cache of bare git mirrors of repositories' branches and tags.
+
+    The first checkout of a repository clones a mirror; later checkouts only
+    fetch what changed since. Checkouts are local clones of the mirror, whose
+    objects git hard-links rather than copies, so they are cheap and stay
+    valid after the mirror is evicted. Once the mirrors together exceed
+    max_bytes, the least recently used ones are deleted.
+
+    Every mirror has a lock file next to it: updates and evictions take it
+    exclusively and checkouts take it shared, so concurrent jobs, also in
+    other processes, never see a mirror that is half fetched or half deleted.
+    Its size is measured once per update and kept in a .size file next to
+    it, so deciding what to evict does not walk every mirror.
+    """
+    def __init__(self, root='cache/mirrors', max_bytes=None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._thread_locks = {}
+        self._thread_locks_guard = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def mirror_path(self, github_url):
+        owner_repo = parse_owner_repo(github_url)
+        if not owner_repo:
+            return None
+        owner, repo = owner_repo
+        return os.path.join(self.root, owner.lower(), f"{repo.lower()}.git")
+
+    @contextmanager
+    def _lock(self, mirror_path, shared=False, blocking=True):
+        """
+        Hold the mirror's lock for the duration of the block; yields False
+        instead of waiting when blocking is False and the lock is taken.
+        """
+        if fcntl is None:
+            with self._thread_locks_guard:
+                lock = self._thread_locks.setdefault(mirror_path, threading.Lock())
+            acquired = lock.acquire(blocking)
+            try:
+                yield acquired
+            finally:
+                if acquired:
+                    lock.release()
+            return
+
+        lock_path = mirror_path + '.lock'
+        flags = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+        if not blocking:
+            flags |= fcntl.LOCK_NB
+        while True:
+            os.makedirs(os.path.dirname(mirror_path), exist_ok=True)
+            lock_file = open(lock_path, 'a')
+            try:
+                fcntl.flock(lock_file, flags)
+            except BlockingIOError:
+                lock_file.close()
+                yield False
+                return
+            try:
+                current = os.stat(lock_path)
+            except FileNotFoundError:
+                current = None
+            if current is not None and os.path.samestat(current, os.fstat(lock_file.fileno())):
+                break
+            # An eviction deleted the lock file while we waited for it; lock the new one
+            lock_file.close()
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+
+    def _record_size(self, mirror_path, measured_path=None):
+        """
+        Store the size of the mirror, measured at measured_path if it is
+        still being moved into place.
+        """
+        size_path = mirror_path + '.size'
+        partial_path = f"{size_path}.partial-{os.getpid()}-{threading.get_ident()}"
+        with open(partial_path, 'w') as f:
+            f.write(str(directory_size(measured_path or mirror_path)))
+        os.replace(partial_path, size_path)
+
+    @staticmethod
+    def _recorded_size(mirror_path):
+        try:
+            with open(mirror_path + '.size') as f:
+                return int(f.read())
+        except (OSError, ValueError):
+            # The size file was deleted or damaged by hand
+            return directory_size(mirror_path)
+
+    def update(self, github_url):
+        """
+        Create or incrementally fetch the mirror of a repository and return
+        its path, or None if it could not be created.
+        """
+        from git import Git, GitCommandError
+
+        mirror_path = self.mirror_path(github_url)
+        if mirror_path is None:
+            logger.error(f"Cannot derive owner/repo from {github_url}")
+            return None
+        with self._lock(mirror_path):
+            if os.path.isdir(mirror_path):
+                try:
+                    Git(mirror_path).fetch('--prune', 'origin')
+                    self._record_size(mirror_path)
+                    logger.info(f"Fetched updates for mirror of {github_url}")
+                except GitCommandError as e:
+                    # A stale mirror still beats no checkout at all
+                    logger.warning(f"Could not update mirror of {github_url}, using cached copy: {e}")
+            else:
+                partial_path = f"{mirror_path}.partial-{os.getpid()}-{threading.get_ident()}"
+                try:
+                    Git().clone('--bare', github_url, partial_path)
+                    # Track branches only; a --mirror refspec would also pull every pull request ref
+                    Git(partial_path).config('remote.origin.fetch', '+refs/heads/*:refs/heads/*')
+                    # Sized before it becomes visible, so eviction never has to measure it
+                    self._record_size(mirror_path, partial_path)
+                    os.rename(partial_path, mirror_path)
+                    logger.info(f"Created mirror of {github_url}")
+                except Exception as e:
+                    logger.error(f"Error mirroring {github_url}: {e}")
+                    shutil.rmtree(partial_path, ignore_errors=True)
+                    if os.path.exists(mirror_path + '.size'):
+                        os.remove(mirror_path + '.size')
+                    return None
+            os.utime(mirror_path)  # The directory's mtime orders mirrors for eviction
+        self.evict(keep=mirror_path)
+        return mirror_path
+
+    def checkout(self, github_url, local_path):
+        """
+        Check out the default branch of a repository into local_path via its
+        mirror and return local_path, or None on failure.
+        """
+        from git import Repo
+
+        mirror_path = self.update(github_url)
+        if mirror_path is None:
+            return None
+        with self._lock(mirror_path, shared=True):
+            if not os.path.isdir(mirror_path):
+                # Evicted between update and checkout
+                logger.warning(f"Mirror of {github_url} disappeared before checkout")
+                return None
+            try:
+                Repo.clone_from(mirror_path, local_path)
+            except Exception as e:
+                logger.error(f"Error checking out {github_url} from its mirror: {e}")
+                shutil.rmtree(local_path, ignore_errors=True)
+                return None
+        logger.info(f"Checked out {github_url} to {local_path} from its mirror")
+        return local_path
+
+    def _mirrors(self):
+        mirrors = []
+        for owner in os.listdir(self.root):
+            owner_path = os.path.join(self.root, owner)
+            if not os.path.isdir(owner_path):
+                continue
+            for name in os.listdir(owner_path):
+                path = os.path.join(owner_path, name)
+                if name.endswith('.git') and os.path.isdir(path):
+                    mirrors.append((os.path.getmtime(path), self._recorded_size(path), path))
+        return mirrors
+
+    def evict(self, keep=None):
+        """
+        Delete least recently used mirrors until the cache fits in max_bytes.
+
+        Mirrors in use by another job are skipped, as is keep.
+        """
+        if not self.max_bytes:
+            return
+        mirrors = sorted(self._mirrors())
+        total = sum(size for _, size, _ in mirrors)
+        for _, size, path in mirrors:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            with self._lock(path, blocking=False) as acquired:
+                if not acquired:
+                    continue
+                shutil.rmtree(path, ignore_errors=True)
+                for suffix in ('.size', '.lock'):
+                    try:
+                        os.remove(path + suffix)
+                    except FileNotFoundError:
+                        pass
+            total -= size
+            logger.info(f"Evicted mirror {path} ({size} bytes)")
@@ -3,11 +3,16 @@ import os
 import base64
 import json
 import logging
-import requests
-import yaml
+from app_config import get_config, endpoint_url
 from dotenv import load_dotenv
 
-from prompts import EXTRACT_INFORMATION_PROMPT, ASK_QUESTION_ABOUT_CODE_PROMPT, EVALUATE_CANDIDATE_PROMPT
+from llm_cache import LLMCache
+from metrics import span, count, record_usage
+from chunking import truncate_to_tokens
+from prompts import (
+    EXTRACT_INFORMATION_PROMPT, EXTRACT_INFORMATION_PAGES_PROMPT, ASK_QUESTION_ABOUT_CODE_PROMPT,
+    REDUCE_CODE_SUMMARIES_PROMPT, EVALUATE_CANDIDATE_PROMPT
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -19,26 +24,126 @@ openai_api_key = os.getenv("OPENAI_API_KEY")
 github_access_token = os.getenv("GITHUB_ACCESS_TOKEN")
 
 # Load configuration
-with open('config.yaml', 'r') as f:
-    config = yaml.safe_load(f)
+config = get_config()
 
 models = config['models']
 
-def encode_image(image_path):
-    with open(image_path, "rb") as image_file:
-        return base64.b64encode(image_file.read()).decode('utf-8')
+# Base URL of the chat-completions API; OPENAI_BASE_URL overrides it (e.g. for local stand-ins)
+openai_base_url = endpoint_url('openai_base_url')
 
-def extract_information_from_cv(image_path, api_params):
-    base64_image = encode_image(image_path)
+summarization_config = config.get('summarization', {}) or {}
+max_chunk_tokens = summarization_config.get('max_chunk_tokens', 3000)  # Largest code excerpt sent in one prompt
+
+# Response cache shared by all chat-completion calls
+llm_cache_config = config.get('llm_cache', {}) or {}
+llm_cache = None
+if llm_cache_config.get('enabled', False):
+    llm_cache = LLMCache(
+        path=llm_cache_config.get('path', 'cache/llm_cache.sqlite3'),
+        ttl_seconds=llm_cache_config.get('ttl_seconds'),
+        max_size_mb=llm_cache_config.get('max_size_mb')
+    )
+
+class APIRequestError(Exception):
+    """Raised when a chat-completion request needed for a result fails."""
+
+def cache_allowed(api_params):
+    """
+    Whether stored results may be reused for a request with these parameters.
+
+    Also used by the repository summary cache, so both caches agree on when
+    a fresh sample is required.
+    """
+    if api_params.get('bypass_cache', False):
+        return False
+    # Sampled responses are only cached when the config allows reusing them
+    if (api_params.get('temperature') or 0) > 0 and llm_cache_config.get('bypass_when_sampling', False):
+        return False
+    return True
+
+def _should_use_cache(payload, api_params):
+    return llm_cache is not None and cache_allowed(api_params)
+
+def post_chat_completion(payload, api_params, stage='llm_call'):
+    """
+    Send a chat-completion request and return the first choice's content.
+
+    Successful responses are served from and stored in the LLM cache when it
+    is enabled. The call is timed as `stage` and its token usage recorded.
+    Returns None if the request failed.
+    """
+    import requests
+    import http_client
+
+    use_cache = _should_use_cache(payload, api_params)
+    if use_cache:
+        cache_key = LLMCache.make_key(payload)
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"LLM cache hit for model {payload['model']}")
+            count('resume_llm_cache_hits_total', model=payload['model'])
+            return cached
+
+    headers = {
+        "Authorization": f"Bearer {openai_api_key}",
+        "Content-Type": "application/json"
+    }
+
+    try:
+        with span(stage):
+            response = http_client.post(
+                f"{openai_base_url}/chat/completions",
+                headers=headers,
+                json=payload
+            )
+    except requests.RequestException as e:
+        logger.error(f"API request failed: {e}")
+        return None
+
+    if response.status_code != 200:
+        logger.error(f"API request failed with status code {response.status_code}: {response.text}")
+        return None
+
+    response_json = response.json()
+    record_usage(payload['model'], response_json.get('usage'))
+    content = response_json["choices"][0]["message"]["content"].strip()
+    if use_cache:
+        llm_cache.set(cache_key, content)
+    return content
+
+def encode_image(image_bytes):
+    return base64.b64encode(image_bytes).decode('utf-8')
+
+def _parse_extraction_response(response_text):
+    try:
+        data = json.loads(response_text)
+        extracted_info = data.get('extracted_info', {})
+        cv_summary = data.get('cv_summary', '')
+        return extracted_info, cv_summary
+    except json.JSONDecodeError as e:
+        logger.error(f"JSON decoding error: {e}")
+        return {}, response_text  # Return the raw text as summary if JSON parsing fails
+
+def extract_information_from_cv(image_bytes, api_params, mime_type='image/png'):
+    return extract_information_from_cv_pages([image_bytes], api_params, mime_type=mime_type)
+
+def extract_information_from_cv_pages(page_images, api_params, mime_type='image/png'):
+    """
+    Extract information from one or more CV page images in a single request.
+
+    Raises APIRequestError if the request fails.
+    """
+    prompt = EXTRACT_INFORMATION_PROMPT if len(page_images) == 1 else EXTRACT_INFORMATION_PAGES_PROMPT
+    content = [{"type": "text", "text": prompt}]
+    for image_bytes in page_images:
+        base64_image = encode_image(image_bytes)
+        content.append({"type": "image_url", "image_url": {"url": f"data:{mime_type};base64,{base64_image}"}})
 
     # Prepare the messages for the chat model
     messages = [
         {
             "role": "user",
-            "content": [
-                {"type": "text", "text": EXTRACT_INFORMATION_PROMPT},
-                {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{base64_image}"}},
-            ],
+            "content": content,
         }
     ]
 
@@ -51,42 +156,21 @@ def extract_information_from_cv(image_path, api_params):
         "n": api_params.get('n', 1),
     }
 
-    headers = {
-        "Authorization": f"Bearer {openai_api_key}",
-        "Content-Type": "application/json"
-    }
-
-    response = requests.post(
-        "https://api.openai.com/v1/chat/completions",
-        headers=headers,
-        json=payload
-    )
-
-    if response.status_code == 200:
-        response_json = response.json()
-        response_text = response_json["choices"][0]["message"]["content"].strip()
-
-        try:
-            data = json.loads(response_text)
-            extracted_info = data.get('extracted_info', {})
-            cv_summary = data.get('cv_summary', '')
-            return extracted_info, cv_summary
-        except json.JSONDecodeError as e:
-            logger.error(f"JSON decoding error: {e}")
-            return {}, response_text  # Return the raw text as summary if JSON parsing fails
-    else:
-        logger.error(f"API request failed with status code {response.status_code}: {response.text}")
-        return {}, ""
+    response_text = post_chat_completion(payload, api_params, stage='vision_call')
+    if response_text is None:
+        raise APIRequestError("CV extraction request failed")
+    return _parse_extraction_response(response_text)
 
 def ask_question_about_code(codebase_text, question, api_params):
+    import requests
+
     if not codebase_text.strip():
         logger.error("Empty codebase_text provided. Skipping OpenAI API call.")
         return ""
 
     try:
-        # Limit the codebase text to a manageable size
-        max_codebase_length = 8000  # Adjust based on token limits
-        codebase_excerpt = codebase_text[:max_codebase_length]
+        # Limit the codebase text to the per-prompt token budget
+        codebase_excerpt = truncate_to_tokens(codebase_text, max_chunk_tokens, models['language_model'])
 
         prompt = ASK_QUESTION_ABOUT_CODE_PROMPT(codebase_excerpt, question)
 
@@ -100,24 +184,8 @@ def ask_question_about_code(codebase_text, question, api_params):
             "n": api_params.get('n', 1),
         }
 
-        headers = {
-            "Authorization": f"Bearer {openai_api_key}",
-            "Content-Type": "application/json"
-        }
-
-        response = requests.post(
-            "https://api.openai.com/v1/chat/completions",
-            headers=headers,
-            json=payload
-        )
-
-        if response.status_code == 200:
-            response_json = response.json()
-            answer = response_json["choices"][0]["message"]["content"].strip()
-            return answer
-        else:
-            logger.error(f"API request failed with status code {response.status_code}: {response.text}")
-            return ""
+        answer = post_chat_completion(payload, api_params, stage='code_summary')
+        return answer if answer is not None else ""
     except requests.RequestException as e:
         logger.error(f"API request failed: {e}")
         return ""
@@ -126,7 +194,30 @@ def ask_question_about_code(codebase_text, question, api_params):
         return ""
 
 
+def reduce_code_summaries(chunk_summaries, question, api_params):
+    """
+    Combine the summaries of a repository's chunks into a single answer.
+    """
+    prompt = REDUCE_CODE_SUMMARIES_PROMPT(chunk_summaries, question)
+
+    payload = {
+        "model": models['language_model'],
+        "messages": [
+            {"role": "user", "content": prompt}
+        ],
+        "max_tokens": api_params.get('max_tokens', 500),
+        "temperature": api_params.get('temperature', 0),
+        "n": api_params.get('n', 1),
+    }
+
+    answer = post_chat_completion(payload, api_params, stage='code_reduce')
+    return answer if answer is not None else ""
+
 def evaluate_candidate(cv_summary, github_summary, api_params):
+    """
+    Return the LLM's evaluation of the candidate; raises APIRequestError if
+    the request fails.
+    """
     prompt = EVALUATE_CANDIDATE_PROMPT(cv_summary, github_summary)
 
     payload = {
@@ -139,21 +230,7 @@ def evaluate_candidate(cv_summary, github_summary, api_params):
         "n": api_params.get('n', 1),
     }
 
-    headers = {
-        "Authorization": f"Bearer {openai_api_key}",
-        "Content-Type": "application/json"
-    }
-
-    response = requests.post(
-        "https://api.openai.com/v1/chat/completions",
-        headers=headers,
-        json=payload
-    )
-
-    if response.status_code == 200:
-        response_json = response.json()
-        evaluation = response_json["choices"][0]["message"]["content"].strip()
-        return evaluation
-    else:
-        logger.error(f"API request failed with status code {response.status_code}: {response.text}")
-        return "Evaluation could not be generated."
+    evaluation = post_chat_completion(payload, api_params, stage='evaluation')
+    if evaluation is None:
+        raise APIRequestError("Evaluation request failed")
+    return evaluation
@@ -0,0 +1,129 @@
+import re
+import zlib
+import logging
+from functools import lru_cache
+
+from app_config import get_config
+from prompts import JOB_DESCRIPTION
+from candidate_index import candidate_skills
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Load configuration
+config = get_config()
+
+prescreen_config = config.get('prescreen', {}) or {}
+n_features = prescreen_config.get('n_features', 2 ** 14)  # Hashed n-gram buckets per document vector
+ngram_range = tuple(prescreen_config.get('ngram_range', [1, 2]))  # Word n-gram lengths hashed into the vectors
+skill_weight = prescreen_config.get('skill_weight', 2)  # Times the extracted skills are counted relative to the summary
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.\-]*[a-z0-9+#]|[a-z0-9]")
+
+def load_job_description():
+    """
+    Return the configured job description: prescreen.job_description,
+    then the file at prescreen.job_description_path, then the built-in one.
+    """
+    if prescreen_config.get('job_description'):
+        return prescreen_config['job_description']
+    if prescreen_config.get('job_description_path'):
+        with open(prescreen_config['job_description_path'], 'r', encoding='utf-8') as f:
+            return f.read()
+    return JOB_DESCRIPTION
+
+def candidate_text(extracted_info, cv_summary):
+    """
+    The text a candidate is scored on: the CV summary plus the extracted
+    skills, the latter repeated skill_weight times.
+    """
+    skills = candidate_skills(extracted_info)
+    return " ".join([cv_summary or ""] + [skills] * skill_weight)
+
+def _ngram_hashes(text):
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    hashes = []
+    for n in range(ngram_range[0], ngram_range[1] + 1):
+        for start in range(len(tokens) - n + 1):
+            # crc32 rather than hash(): bucket assignment must not change between processes
+            hashes.append(zlib.crc32(" ".join(tokens[start:start + n]).encode('utf-8')) % n_features)
+    return hashes
+
+def vectorize(texts):
+    """
+    Return a (len(texts), n_features) matrix of hashed n-gram counts.
+    """
+    import numpy as np
+
+    rows, columns = [], []
+    for row, text in enumerate(texts):
+        hashes = _ngram_hashes(text)
+        rows.extend([row] * len(hashes))
+        columns.extend(hashes)
+    counts = np.zeros((len(texts), n_features), dtype=np.float32)
+    np.add.at(counts, (np.asarray(rows, dtype=np.intp), np.asarray(columns, dtype=np.intp)), 1.0)
+    return counts
+
+def fit_idf(reference_texts):
+    """
+    Return smoothed IDF weights fitted on a fixed reference corpus.
+    """
+    import numpy as np
+
+    counts = vectorize(reference_texts)
+    document_frequency = np.count_nonzero(counts, axis=0)
+    return (np.log((1 + counts.shape[0]) / (1 + document_frequency)) + 1).astype(np.float32)
+
+@lru_cache(maxsize=None)
+def reference_idf():
+    """
+    IDF weights from the documents in prescreen.reference_path (one per
+    line), or None to weight every n-gram equally.
+    """
+    reference_path = prescreen_config.get('reference_path')
+    if not reference_path:
+        return None
+    with open(reference_path, 'r', encoding='utf-8') as f:
+        documents = [line for line in f if line.strip()]
+    return fit_idf(documents) if documents else None
+
+def tfidf(counts, idf=None):
+    """
+    Turn a count matrix into L2-normalized rows of sublinear tf, weighted
+    by idf when given.
+    """
+    import numpy as np
+
+    weights = np.log1p(counts)
+    if idf is not None:
+        weights = weights * idf
+    norms = np.linalg.norm(weights, axis=1, keepdims=True)
+    return weights / np.maximum(norms, 1e-12)
+
+def score_candidates(job_description, texts):
+    """
+    Return the cosine similarity of every candidate text to the job description.
+
+    The weights are fixed (see reference_idf) rather than fitted on the
+    candidates, so a candidate scores the same alone as inside any batch
+    and one threshold means the same everywhere. A batch is still scored
+    with a single matrix product.
+    """
+    if not texts:
+        return []
+    idf = reference_idf()
+    job_vector = tfidf(vectorize([job_description]), idf)[0]
+    return (tfidf(vectorize(list(texts)), idf) @ job_vector).tolist()
+
+def select_candidates(scores, threshold=None, top_k=None):
+    """
+    Return the indices of the candidates that pass the pre-screen, best first:
+    those scoring at least threshold, at most top_k of them.
+    """
+    ranked = sorted(range(len(scores)), key=lambda index: scores[index], reverse=True)
+    if threshold is not None:
+        ranked = [index for index in ranked if scores[index] >= threshold]
+    if top_k is not None:
+        ranked = ranked[:top_k]
+    return ranked
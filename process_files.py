@@ -1,21 +1,187 @@
-# process_files.py
 import os
+import logging
 
-def read_code_files(repo_path, extensions=None):
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# File extensions considered part of a repository's code base
+DEFAULT_EXTENSIONS = [
+    '.py', '.js', '.java', '.cpp', '.c', '.cs', '.go', '.rb',
+    '.php', '.html', '.css', '.md', '.txt'
+]
+
+# Vendored, generated and tooling directories that say nothing about the author
+SKIP_DIRS = {
+    '.git', '.hg', '.svn', '.idea', '.vscode', '__pycache__', '.mypy_cache',
+    '.pytest_cache', '.tox', '.venv', 'venv', 'env', 'site-packages',
+    'node_modules', 'bower_components', 'vendor', 'third_party', 'dist',
+    'build', 'out', 'target', '.next', 'coverage', 'htmlcov'
+}
+SKIP_FILES = {
+    'package-lock.json', 'yarn.lock', 'pnpm-lock.yaml', 'poetry.lock',
+    'Pipfile.lock', 'Cargo.lock', 'composer.lock', 'Gemfile.lock', 'go.sum'
+}
+SKIP_SUFFIXES = ('.min.js', '.min.css', '.map', '.bundle.js', '.lock')
+
+# Files read first because they describe the project best
+MANIFEST_FILES = {
+    'requirements.txt', 'setup.py', 'pyproject.toml', 'setup.cfg', 'Pipfile',
+    'environment.yml', 'package.json', 'pom.xml', 'build.gradle', 'go.mod',
+    'Cargo.toml', 'Gemfile', 'composer.json', 'CMakeLists.txt', 'Makefile',
+    'Dockerfile'
+}
+ENTRY_POINT_FILES = {
+    'main.py', '__main__.py', 'app.py', 'cli.py', 'manage.py', 'train.py',
+    'index.js', 'main.js', 'app.js', 'server.js', 'main.go', 'Main.java',
+    'main.cpp', 'main.c', 'Program.cs'
+}
+
+# Rough characters-per-token ratio used to turn a token budget into characters
+CHARS_PER_TOKEN = 4
+
+def _is_binary(file_path, sample_size=1024):
+    try:
+        with open(file_path, 'rb') as f:
+            return b'\0' in f.read(sample_size)
+    except OSError:
+        return True
+
+def _file_priority(file_name):
+    """
+    Lower values are read first: README, entry points, manifests, then
+    the remaining sources.
+    """
+    lower_name = file_name.lower()
+    if lower_name.startswith('readme'):
+        return 0
+    if file_name in ENTRY_POINT_FILES:
+        return 1
+    if file_name in MANIFEST_FILES:
+        return 2
+    if lower_name.endswith(('.md', '.txt')):
+        return 4
+    return 3
+
+def list_code_files(repo_path, extensions=None):
+    """
+    Return the readable code files of a repository, most informative first.
+
+    Vendored, generated and binary files are skipped. Within a priority
+    class, larger and shallower files come first.
+    """
     if extensions is None:
-        extensions = [
-            '.py', '.js', '.java', '.cpp', '.c', '.cs', '.go', '.rb',
-            '.php', '.html', '.css', '.md', '.txt'
-        ]
-    code_contents = ""
-    for root, _, files in os.walk(repo_path):
+        extensions = DEFAULT_EXTENSIONS
+    extensions = tuple(extensions)
+
+    candidates = []
+    for root, dirs, files in os.walk(repo_path):
+        # Prune skipped directories in place so os.walk never descends into them
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS and not d.endswith('.egg-info')]
+        depth = os.path.relpath(root, repo_path).count(os.sep)
         for file in files:
-            if file.endswith(tuple(extensions)):
-                file_path = os.path.join(root, file)
-                try:
-                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        file_content = f.read()
-                        code_contents += f"\n\n### File: {file_path}\n{file_content}"
-                except Exception as e:
-                    print(f"Could not read {file_path}: {e}")
-    return code_contents
+            if file in SKIP_FILES or file.endswith(SKIP_SUFFIXES):
+                continue
+            if not (file.endswith(extensions) or file in MANIFEST_FILES):
+                continue
+            file_path = os.path.join(root, file)
+            try:
+                size = os.path.getsize(file_path)
+            except OSError:
+                continue
+            if size == 0:
+                continue
+            candidates.append((_file_priority(file), depth, -size, file_path))
+
+    candidates.sort()
+    return [file_path for _, _, _, file_path in candidates]
+
+def _file_header(relative_path):
+    return f"\n\n### File: {relative_path}\n"
+
+def iter_code_sections(repo_path, extensions=None, max_chars=None, dedup=None):
+    """
+    Yield (section, relative_path, digest, complete) for a repository's
+    files until max_chars is reached.
+
+    Only as much of each file as still fits in the budget is read from disk;
+    complete tells whether the section holds the whole file. With a
+    FileDedupStore, digest is the file's content digest (None for files too
+    small to dedup), for resolve_duplicates(); nothing is looked up or
+    recorded here, so repositories can be read in any order.
+    """
+    remaining = max_chars
+    for file_path in list_code_files(repo_path, extensions):
+        if remaining is not None and remaining <= 0:
+            break
+        if _is_binary(file_path):
+            continue
+        relative_path = os.path.relpath(file_path, repo_path)
+        header = _file_header(relative_path)
+        try:
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                if remaining is None:
+                    file_content = f.read()
+                    complete = True
+                else:
+                    limit = max(remaining - len(header), 0)
+                    file_content = f.read(limit)
+                    complete = len(file_content) < limit or not f.read(1)
+        except Exception as e:
+            logger.warning(f"Could not read {file_path}: {e}")
+            continue
+        if not file_content.strip():
+            continue
+        section = header + file_content
+        if remaining is not None:
+            complete = complete and len(section) <= remaining
+            section = section[:remaining]
+            remaining -= len(section)
+        digest = dedup.digest(file_path) if dedup is not None else None
+        yield section, relative_path, digest, complete
+
+def resolve_duplicates(sections, dedup, owner, repo_name, dedup_mode='reference'):
+    """
+    Return (section, record, duplicate_of) for the sections of
+    iter_code_sections.
+
+    Files whose content was already sent from another repository are
+    replaced by a one-line reference to that copy (dedup_mode='reference')
+    or by an empty section (dedup_mode='skip'), and duplicate_of names the
+    copy. For a file sent in full, record is the (digest, label) pair to
+    pass to FileDedupStore.record() once the section is known to reach the
+    prompt. Without a dedup store the sections are returned unchanged.
+    """
+    resolved = []
+    for section, relative_path, digest, complete in sections:
+        duplicate_of = dedup.lookup(digest, owner) if dedup is not None and digest is not None else None
+        if duplicate_of is not None:
+            reference = "" if dedup_mode == 'skip' else (
+                f"{_file_header(relative_path)}[Duplicate of {duplicate_of}; content omitted]\n"
+            )
+            resolved.append((reference, None, duplicate_of))
+            continue
+        # Only a file sent to its end can later be referenced
+        record = (digest, f"{repo_name}/{relative_path}") if digest is not None and complete else None
+        resolved.append((section, record, None))
+    return resolved
+
+def iter_code_files(repo_path, extensions=None, max_chars=None):
+    """
+    Yield the formatted file sections of iter_code_sections, without the
+    dedup bookkeeping.
+    """
+    for section, _, _, _ in iter_code_sections(repo_path, extensions, max_chars):
+        yield section
+
+def read_code_files(repo_path, extensions=None, max_chars=None, max_tokens=None):
+    """
+    Read a repository's code into a single string, stopping at the budget.
+
+    max_tokens is converted to characters with a rough CHARS_PER_TOKEN ratio;
+    when both budgets are given the smaller one applies.
+    """
+    if max_tokens is not None:
+        token_chars = max_tokens * CHARS_PER_TOKEN
+        max_chars = token_chars if max_chars is None else min(max_chars, token_chars)
+    return "".join(iter_code_files(repo_path, extensions, max_chars))
@@ -1,5 +1,14 @@
 # prompts.py
 
+# Description of the open role, used by the local pre-screen (prescreen.py) unless config.yaml sets one
+JOB_DESCRIPTION = """
+Machine Learning Engineer, Document Analysis and Recognition.
+Builds and trains deep learning models for OCR, handwriting recognition, layout analysis,
+table and form understanding, document classification and information extraction from scanned
+documents and PDFs. Works with Python, PyTorch, TensorFlow, computer vision, image processing,
+OpenCV, transformers, NLP, data annotation and evaluation pipelines, and deploys models to production.
+"""
+
 # Prompt for extracting information from CV
 EXTRACT_INFORMATION_PROMPT = """
 You are an HR assistant helping to screen candidates for a Machine Learning Engineer position focused on Document Analysis and Recognition.
@@ -23,6 +32,12 @@ Then, generate a concise summary highlighting the candidate's qualifications und
 Ensure the response is in JSON format with keys 'extracted_info' and 'cv_summary'.
 """
 
+# Prompt for extracting information from all pages of a CV in one request
+EXTRACT_INFORMATION_PAGES_PROMPT = EXTRACT_INFORMATION_PROMPT.replace(
+    "From the CV image provided,",
+    "The images provided are the consecutive pages of a single CV. Considering all pages together,"
+)
+
 # Prompt for asking question about code
 def ASK_QUESTION_ABOUT_CODE_PROMPT(codebase_excerpt, question):
     return f"""
@@ -35,6 +50,25 @@ Answer the following question about the codebase:
 Question: {question}
 """
 
+# Question asked for one chunk of a repository that does not fit in a single prompt
+def CODE_CHUNK_QUESTION(repo_name, chunk_index, chunk_count):
+    return f"""This is part {chunk_index} of {chunk_count} of the repository '{repo_name}'. Summarize what this part implements, the technologies and libraries it uses, and the quality and complexity of the code."""
+
+# Prompt for combining the chunk summaries of a repository into one summary
+def REDUCE_CODE_SUMMARIES_PROMPT(chunk_summaries, question):
+    joined_summaries = "\n\n".join(
+        f"Part {index}:\n{summary}" for index, summary in enumerate(chunk_summaries, start=1)
+    )
+    return f"""
+You are a code reviewer and software engineer with expertise in machine learning and document analysis.
+
+A repository was reviewed in several parts. Here are the summaries of each part:
+{joined_summaries}
+
+Using these summaries, answer the following question about the whole repository:
+Question: {question}
+"""
+
 # Prompt for evaluating candidate
 def EVALUATE_CANDIDATE_PROMPT(cv_summary, github_summary):
     return f"""
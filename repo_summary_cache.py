@@ -0,0 +1,71 @@
+import os
+import time
+import sqlite3
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class RepoSummaryCache:
+    """
+    SQLite store of repository summaries keyed by repository URL and commit SHA.
+
+    A stored summary is only returned while the remote HEAD still points at
+    the commit it was generated from, so unchanged repositories never need
+    to be cloned or read again.
+    """
+    def __init__(self, path='cache/repo_summaries.sqlite3'):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS repo_summaries ("
+                " repo_url TEXT NOT NULL,"
+                " sha TEXT NOT NULL,"
+                " fingerprint TEXT NOT NULL,"
+                " summary TEXT NOT NULL,"
+                " updated_at REAL NOT NULL,"
+                " PRIMARY KEY (repo_url, fingerprint))"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def normalize_url(repo_url):
+        repo_url = repo_url.strip().rstrip('/').lower()
+        if repo_url.endswith('.git'):
+            repo_url = repo_url[:-len('.git')]
+        return repo_url
+
+    def get(self, repo_url, sha, fingerprint=''):
+        """
+        Return the stored summary if it was generated from this exact commit.
+        """
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT sha, summary FROM repo_summaries WHERE repo_url = ? AND fingerprint = ?",
+                    (self.normalize_url(repo_url), fingerprint)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Repository summary cache read failed: {e}")
+            return None
+        if row is None or row[0] != sha:
+            return None
+        return row[1]
+
+    def set(self, repo_url, sha, summary, fingerprint=''):
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO repo_summaries (repo_url, sha, fingerprint, summary, updated_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (self.normalize_url(repo_url), sha, fingerprint, summary, time.time())
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Repository summary cache write failed: {e}")
@@ -0,0 +1,235 @@
+import os
+import re
+import ast
+import json
+import logging
+
+from process_files import SKIP_DIRS, MANIFEST_FILES
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11; pyproject.toml dependencies are then read with a regex
+    tomllib = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+LANGUAGES = {
+    '.py': 'Python', '.ipynb': 'Jupyter Notebook', '.js': 'JavaScript', '.jsx': 'JavaScript',
+    '.ts': 'TypeScript', '.tsx': 'TypeScript', '.java': 'Java', '.kt': 'Kotlin', '.scala': 'Scala',
+    '.c': 'C', '.h': 'C', '.cpp': 'C++', '.cc': 'C++', '.hpp': 'C++', '.cs': 'C#', '.go': 'Go',
+    '.rs': 'Rust', '.rb': 'Ruby', '.php': 'PHP', '.swift': 'Swift', '.m': 'MATLAB/Objective-C',
+    '.r': 'R', '.jl': 'Julia', '.sh': 'Shell', '.html': 'HTML', '.css': 'CSS', '.sql': 'SQL',
+    '.cu': 'CUDA',
+}
+
+# Largest file whose lines are counted; bigger files are usually data or generated
+MAX_FILE_BYTES = 1024 * 1024
+
+def _cyclomatic_complexity(node):
+    """
+    McCabe-style complexity of a function: one plus the number of branches.
+    """
+    complexity = 1
+    for child in ast.walk(node):
+        if isinstance(child, (ast.If, ast.For, ast.AsyncFor, ast.While, ast.IfExp, ast.ExceptHandler, ast.Assert)):
+            complexity += 1
+        elif isinstance(child, ast.BoolOp):
+            complexity += len(child.values) - 1
+        elif isinstance(child, ast.comprehension):
+            complexity += 1 + len(child.ifs)
+        elif hasattr(ast, 'match_case') and isinstance(child, ast.match_case):
+            complexity += 1
+    return complexity
+
+def outline_python(source):
+    """
+    Return the classes (with their methods) and top-level functions of a
+    Python module, each function with its cyclomatic complexity.
+    """
+    tree = ast.parse(source)
+    outline = {'classes': [], 'functions': [], 'docstring': (ast.get_docstring(tree) or '').split('\n')[0]}
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            outline['functions'].append((node.name, _cyclomatic_complexity(node)))
+        elif isinstance(node, ast.ClassDef):
+            methods = [
+                (child.name, _cyclomatic_complexity(child))
+                for child in node.body
+                if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef))
+            ]
+            bases = [ast.unparse(base) for base in node.bases] if hasattr(ast, 'unparse') else []
+            outline['classes'].append((node.name, bases, methods))
+    return outline
+
+def _requirements_dependencies(text):
+    dependencies = []
+    for line in text.splitlines():
+        line = line.split('#')[0].strip()
+        if not line or line.startswith('-'):
+            continue
+        name = re.split(r'[<>=!~\[;\s]', line, maxsplit=1)[0]
+        if name:
+            dependencies.append(name)
+    return dependencies
+
+def _pyproject_dependencies(text):
+    if tomllib is not None:
+        data = tomllib.loads(text)
+        project = data.get('project', {})
+        dependencies = list(project.get('dependencies', []))
+        poetry = data.get('tool', {}).get('poetry', {}).get('dependencies', {})
+        dependencies.extend(name for name in poetry if name != 'python')
+        return _requirements_dependencies("\n".join(dependencies))
+    match = re.search(r'dependencies\s*=\s*\[(.*?)\]', text, re.S)
+    return _requirements_dependencies("\n".join(re.findall(r'"([^"]+)"', match.group(1)))) if match else []
+
+def parse_manifest(file_name, text):
+    """
+    Return the dependency names declared in a manifest, or [] if unknown.
+    """
+    if file_name == 'requirements.txt' or (file_name.startswith('requirements') and file_name.endswith('.txt')):
+        return _requirements_dependencies(text)
+    if file_name == 'package.json':
+        data = json.loads(text)
+        return sorted(set(data.get('dependencies', {})) | set(data.get('devDependencies', {})))
+    if file_name == 'pyproject.toml':
+        return _pyproject_dependencies(text)
+    if file_name == 'setup.py':
+        match = re.search(r'install_requires\s*=\s*\[(.*?)\]', text, re.S)
+        return _requirements_dependencies("\n".join(re.findall(r'[\'"]([^\'"]+)[\'"]', match.group(1)))) if match else []
+    if file_name == 'environment.yml':
+        return [line.strip()[2:].split('=')[0] for line in text.splitlines() if line.strip().startswith('- ')]
+    if file_name == 'go.mod':
+        return re.findall(r'^\s*([\w./-]+\.[\w./-]+)\s+v[\d.]+', text, re.M)
+    if file_name == 'Cargo.toml':
+        section = re.search(r'\[dependencies\](.*?)(?:\n\[|\Z)', text, re.S)
+        return re.findall(r'^\s*([\w-]+)\s*=', section.group(1), re.M) if section else []
+    return []
+
+def analyze_repository(repo_path, max_files=5000):
+    """
+    Build a structured profile of a checked-out repository without any LLM:
+    language breakdown, lines of code, file counts, declared dependencies and
+    an outline of every Python module.
+    """
+    profile = {
+        'file_count': 0,
+        'code_file_count': 0,
+        'loc': 0,
+        'languages': {},  # language -> {'files': n, 'loc': n}
+        'dependencies': {},  # manifest path -> [names]
+        'python_modules': [],  # dicts with path, loc, outline
+    }
+    for root, dirs, files in os.walk(repo_path):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS and not d.endswith('.egg-info')]
+        for file in files:
+            if profile['file_count'] >= max_files:
+                break
+            profile['file_count'] += 1
+            file_path = os.path.join(root, file)
+            relative_path = os.path.relpath(file_path, repo_path)
+            language = LANGUAGES.get(os.path.splitext(file)[1].lower())
+            is_manifest = file in MANIFEST_FILES or (file.startswith('requirements') and file.endswith('.txt'))
+            if language is None and not is_manifest:
+                continue
+            try:
+                if os.path.getsize(file_path) > MAX_FILE_BYTES:
+                    continue
+                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                    text = f.read()
+            except OSError:
+                continue
+
+            if is_manifest:
+                try:
+                    dependencies = parse_manifest(file, text)
+                except Exception as e:
+                    logger.warning(f"Could not parse manifest {relative_path}: {e}")
+                    dependencies = []
+                if dependencies:
+                    profile['dependencies'][relative_path] = dependencies
+            if language is None:
+                continue
+
+            loc = sum(1 for line in text.splitlines() if line.strip())
+            profile['code_file_count'] += 1
+            profile['loc'] += loc
+            stats = profile['languages'].setdefault(language, {'files': 0, 'loc': 0})
+            stats['files'] += 1
+            stats['loc'] += loc
+
+            if language == 'Python':
+                try:
+                    outline = outline_python(text)
+                except (SyntaxError, ValueError):
+                    outline = None
+                profile['python_modules'].append({'path': relative_path, 'loc': loc, 'outline': outline})
+    return profile
+
+def _format_function(name, complexity):
+    return f"{name} [cx {complexity}]" if complexity > 5 else name
+
+def format_profile(profile, max_chars=6000):
+    """
+    Render a repository profile as compact markdown, at most max_chars long.
+
+    Python modules are listed largest first, so the outline that gets cut
+    is that of the smallest modules.
+    """
+    lines = ["## Repository profile (static analysis)"]
+    lines.append(
+        f"Files: {profile['file_count']} ({profile['code_file_count']} code files), "
+        f"non-blank lines of code: {profile['loc']}"
+    )
+    if profile['languages']:
+        total = max(profile['loc'], 1)
+        languages = sorted(profile['languages'].items(), key=lambda item: item[1]['loc'], reverse=True)
+        lines.append("Languages: " + ", ".join(
+            f"{language} {stats['loc'] * 100 // total}% ({stats['loc']} LOC, {stats['files']} files)"
+            for language, stats in languages
+        ))
+    if profile['dependencies']:
+        lines.append("Dependencies:")
+        for manifest, dependencies in sorted(profile['dependencies'].items()):
+            lines.append(f"- {manifest}: {', '.join(dependencies[:40])}")
+
+    functions = []
+    for module in profile['python_modules']:
+        outline = module['outline']
+        if not outline:
+            continue
+        functions.extend((complexity, f"{module['path']}:{name}") for name, complexity in outline['functions'])
+        for class_name, _, methods in outline['classes']:
+            functions.extend((complexity, f"{module['path']}:{class_name}.{name}") for name, complexity in methods)
+    if functions:
+        most_complex = sorted(functions, reverse=True)[:10]
+        lines.append("Most complex Python functions: " + ", ".join(f"{name} ({complexity})" for complexity, name in most_complex))
+
+    header = "\n".join(lines)
+    outline_lines = []
+    modules = sorted(profile['python_modules'], key=lambda module: module['loc'], reverse=True)
+    for module in modules:
+        outline = module['outline']
+        if outline is None:
+            outline_lines.append(f"- {module['path']} ({module['loc']} LOC): could not be parsed")
+            continue
+        parts = []
+        for class_name, bases, methods in outline['classes']:
+            base_text = f"({', '.join(bases)})" if bases else ""
+            parts.append(f"class {class_name}{base_text}: " + ", ".join(_format_function(*method) for method in methods))
+        if outline['functions']:
+            parts.append("def " + ", ".join(_format_function(*function) for function in outline['functions']))
+        docstring = f" \"{outline['docstring'][:80]}\"" if outline['docstring'] else ""
+        outline_lines.append(f"- {module['path']} ({module['loc']} LOC){docstring}: " + "; ".join(parts))
+
+    text = header
+    if outline_lines:
+        text += "\nPython outline:"
+        for index, line in enumerate(outline_lines):
+            if len(text) + len(line) + 1 > max_chars:
+                text += f"\n- ... {len(outline_lines) - index} more modules"
+                break
+            text += "\n" + line
+    return text[:max_chars]
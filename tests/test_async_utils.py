@@ -0,0 +1,42 @@
+import time
+import threading
+
+import pytest
+
+from async_utils import SingleFlight
+
+def test_single_flight_coalesces_concurrent_calls():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def work(value):
+        calls.append(value)
+        started.set()
+        release.wait(5)
+        return value * 2
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do('key', work, 21)))
+    leader.start()
+    assert started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flight.do('key', work, 21))) for _ in range(3)]
+    for follower in followers:
+        follower.start()
+    time.sleep(0.2)  # Let the followers reach the in-flight call
+    release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+
+    assert calls == [21]
+    assert sorted(results) == [(42, False), (42, True), (42, True), (42, True)]
+    # Nothing is kept once the call returns
+    assert flight.do('key', lambda: 'again') == ('again', False)
+
+def test_single_flight_raises_errors_and_keeps_keys_apart():
+    flight = SingleFlight()
+    with pytest.raises(ValueError):
+        flight.do('bad', lambda: (_ for _ in ()).throw(ValueError('boom')))
+    assert flight.do('a', lambda: 1) == (1, False)
+    assert flight.do('b', lambda: 2) == (2, False)
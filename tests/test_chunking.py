@@ -0,0 +1,25 @@
+import pytest
+
+import chunking
+from chunking import chunk_sections
+
+@pytest.fixture
+def char_tokens(monkeypatch):
+    # Count tokens by the character estimate, whether or not tiktoken is installed
+    monkeypatch.setattr(chunking, '_encoding_for', lambda model: None)
+
+def test_chunk_sections_packs_on_file_boundaries(char_tokens):
+    sections = ['a' * 40, 'b' * 40, 'c' * 40]  # 10 tokens each
+    packed = []
+    assert chunk_sections(sections, max_chunk_tokens=20, packed=packed) == ['a' * 40 + 'b' * 40, 'c' * 40]
+    assert packed == [0, 1, 2]
+
+def test_chunk_sections_splits_oversized_sections(char_tokens):
+    assert chunk_sections(['x' * 100], max_chunk_tokens=10) == ['x' * 40, 'x' * 40, 'x' * 20]
+
+def test_chunk_sections_reports_only_sections_placed_in_full(char_tokens):
+    sections = ['a' * 40, 'b' * 40, 'c' * 40]
+    packed = []
+    chunks = chunk_sections(sections, max_chunk_tokens=100, max_total_tokens=15, packed=packed)
+    assert chunks == ['a' * 40 + 'b' * 20]
+    assert packed == [0]
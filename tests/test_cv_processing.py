@@ -0,0 +1,16 @@
+from cv_processing import merge_extracted_info
+
+def test_merge_extracted_info_keeps_every_page():
+    pages = [
+        {'name': 'Ada', 'skills': ['python', 'c'], 'contact': {'email': 'ada@example.com'}, 'title': 'Engineer'},
+        {'name': 'Ada', 'skills': ['c', 'rust'], 'contact': {'github': 'ada'}, 'title': 'Researcher', 'summary': ''},
+        None,
+        {'summary': 'Builds compilers'},
+    ]
+    assert merge_extracted_info(pages) == {
+        'name': 'Ada',
+        'skills': ['python', 'c', 'rust'],
+        'contact': {'email': 'ada@example.com', 'github': 'ada'},
+        'title': ['Engineer', 'Researcher'],
+        'summary': 'Builds compilers',
+    }
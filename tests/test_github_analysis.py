@@ -0,0 +1,248 @@
+import os
+import json
+import time
+import threading
+
+import pytest
+import requests
+
+import github_analysis
+from clone_repo import SharedCheckouts
+from etag_cache import ETagCache
+from github_analysis import canonical_github_link
+
+def test_summarize_chunks_maps_then_reduces(monkeypatch):
+    asked = []
+    monkeypatch.setattr(github_analysis, 'ask_question_about_code', lambda code, question, api_params: asked.append(code) or f"summary of {code}")
+    monkeypatch.setattr(github_analysis, 'reduce_code_summaries', lambda summaries, question, api_params: " | ".join(summaries))
+
+    assert github_analysis.summarize_chunks(['a'], 'repo', 'question', {}) == 'summary of a'
+    assert github_analysis.summarize_chunks(['a', 'b', 'c'], 'repo', 'question', {}) == 'summary of a | summary of b | summary of c'
+    assert sorted(asked) == ['a', 'a', 'b', 'c']
+    assert github_analysis.summarize_chunks([], 'repo', 'question', {}) == ""
+
+@pytest.mark.parametrize('link', [
+    'https://github.com/Owner/repo',
+    'http://www.github.com/Owner/repo/',
+    'github.com/Owner/repo.git',
+    'https://GitHub.com/Owner/repo/tree/main/src?tab=readme',
+    'https://github.com/Owner/repo/issues/3).',
+])
+def test_canonical_github_link_repository_variants(link):
+    assert canonical_github_link(link) == ('Owner', 'repo')
+
+@pytest.mark.parametrize('link, expected', [
+    ('https://github.com/Owner', ('Owner', None)),
+    ('https://github.com/orgs/Acme/repositories', ('Acme', None)),
+    ('https://github.com/features/copilot', None),
+    ('https://github.com/', None),
+    ('https://gitlab.com/Owner/repo', None),
+    ('https://github.com/-owner', None),
+    ('https://github.com/Owner/./x', None),
+    ('https://gist.github.com/Owner/0a1b2c3d', None),
+    ('https://docs.github.com/en/actions', None),
+    ('https://api.github.com/repos/Owner/repo', None),
+])
+def test_canonical_github_link_profiles_and_rejects(link, expected):
+    assert canonical_github_link(link) == expected
+
+def test_extract_github_links_ignores_other_hosts():
+    text = (
+        "Gists: https://gist.github.com/Owner/0a1b2c3d, docs: https://docs.github.com/en/actions,"
+        " mirror: https://example.com/github.com/Other/repo, mail: someone@github.com/x,"
+        " code: github.com/Owner/repo and https://www.github.com/Owner/repo/tree/main."
+    )
+    links = github_analysis.extract_github_links(text, ['https://gist.github.com/Owner/1', 'https://github.com/Owner'])
+    assert links == ['https://github.com/Owner/repo', 'https://github.com/Owner']
+
+def test_budget_waits_for_reservations_to_settle():
+    budget = github_analysis.ScreeningBudget(max_bytes=100)
+    first = budget.reserve(60)
+    second = budget.reserve(60)
+    assert (first, second) == (60, 40)
+    assert not budget.exhausted()
+
+    reserved = []
+    waiter = threading.Thread(target=lambda: reserved.append(budget.reserve(60)))
+    waiter.start()
+    time.sleep(0.1)
+    assert reserved == []  # The rest of the budget is only reserved, not spent
+    budget.settle(first, 10)
+    waiter.join(5)
+    assert reserved == [50]
+
+    budget.settle(second, 40)
+    budget.settle(reserved[0], 50)
+    assert budget.exhausted()
+    assert budget.reserve(60) == 0
+
+def test_budget_stops_waiting_at_the_deadline():
+    budget = github_analysis.ScreeningBudget(max_seconds=0.2, max_bytes=100)
+    reserved = budget.reserve(100)
+    started_at = time.monotonic()
+    assert budget.reserve(10) == 0
+    assert time.monotonic() - started_at < 5
+    budget.settle(reserved, 0)
+
+def test_budget_without_byte_limit_caps_each_fetch():
+    budget = github_analysis.ScreeningBudget()
+    assert budget.reserve(50) == 50
+    budget.settle(50, 1000)
+    assert budget.bytes_used == 1000
+    assert not budget.exhausted()
+
+@pytest.mark.parametrize('max_total_mb', [200, 100])
+def test_concurrent_small_fetches_all_fit_the_budget(monkeypatch, tmp_path, max_total_mb):
+    repos = [
+        ('user', {'name': f'repo{index}', 'html_url': f'https://github.com/user/repo{index}'})
+        for index in range(8)
+    ]
+
+    def fake_clone(repo_url, local_path, max_bytes=None, **kwargs):
+        time.sleep(0.05)
+        os.makedirs(local_path)
+        with open(os.path.join(local_path, 'main.py'), 'w') as f:
+            f.write(f"# {repo_url}\n" + 'x = 1\n' * 70)  # About 450 bytes
+        return local_path
+
+    monkeypatch.setattr(github_analysis, 'collect_repos', lambda links: repos)
+    monkeypatch.setattr(github_analysis, 'clone_github_repo', fake_clone)
+    monkeypatch.setattr(github_analysis, 'summarize_chunks', lambda chunks, repo_name, question, api_params: f"summary of {repo_name}")
+    monkeypatch.setattr(github_analysis, 'summary_cache', None)
+    monkeypatch.setattr(github_analysis, 'shared_checkouts', SharedCheckouts(str(tmp_path)))
+    monkeypatch.setattr(github_analysis, 'budget_max_seconds', None)
+    monkeypatch.setattr(github_analysis, 'budget_max_total_mb', max_total_mb)
+    monkeypatch.setattr(github_analysis, 'max_fetch_bytes', 50 * 1024 * 1024)
+
+    results = github_analysis.analyze_github_repos(['https://github.com/user'], {'temperature': 0})
+    assert sorted(result['repo_name'] for result in results) == [f'repo{index}' for index in range(8)]
+
+def test_concurrent_screenings_share_one_fetch(monkeypatch, tmp_path):
+    repo = {'name': 'shared', 'html_url': 'https://github.com/user/shared'}
+    clones = []
+
+    def fake_clone(repo_url, local_path, max_bytes=None, **kwargs):
+        clones.append(repo_url)
+        time.sleep(0.2)
+        os.makedirs(local_path)
+        with open(os.path.join(local_path, 'main.py'), 'w') as f:
+            f.write('x = 1\n' * 100)
+        return local_path
+
+    monkeypatch.setattr(github_analysis, 'clone_github_repo', fake_clone)
+    monkeypatch.setattr(github_analysis, 'summarize_chunks', lambda chunks, repo_name, question, api_params: f"summary of {repo_name}")
+    monkeypatch.setattr(github_analysis, 'summary_cache', None)
+    monkeypatch.setattr(github_analysis, 'shared_checkouts', SharedCheckouts(str(tmp_path)))
+
+    budgets = [github_analysis.ScreeningBudget(max_bytes=10 * 1024 * 1024) for _ in range(2)]
+    results = [None, None]
+
+    def screen(index):
+        results[index] = github_analysis.analyze_repo('user', repo, {'temperature': 0}, budget=budgets[index])
+
+    threads = [threading.Thread(target=screen, args=(index,)) for index in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert clones == ['https://github.com/user/shared']
+    assert [result['summary'] for result in results] == ['summary of shared'] * 2
+    # Each screening pays for the checkout it read, which is gone afterwards
+    assert [budget.bytes_used for budget in budgets] == [600, 600]
+    assert os.listdir(tmp_path) == []
+
+class FakeListingResponse:
+    def __init__(self, status_code, repos=None, headers=None):
+        self.status_code = status_code
+        self.text = json.dumps(repos) if repos is not None else ''
+        self.headers = headers or {}
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(str(self.status_code))
+
+def test_repo_listings_are_revalidated_with_etags(monkeypatch, tmp_path):
+    import http_client
+
+    sent_headers = []
+    responses = [
+        FakeListingResponse(200, [{'name': 'repo'}], {'ETag': '"v1"'}),
+        FakeListingResponse(304),
+    ]
+
+    def fake_get(url, headers=None, params=None):
+        sent_headers.append(dict(headers))
+        return responses.pop(0)
+
+    monkeypatch.setattr(http_client, 'get', fake_get)
+    monkeypatch.setattr(github_analysis, 'listing_cache', ETagCache(str(tmp_path / 'listings.sqlite3')))
+
+    assert github_analysis.fetch_repos_page('user', 1, {}) == ([{'name': 'repo'}], None)
+    assert github_analysis.fetch_repos_page('user', 1, {}) == ([{'name': 'repo'}], None)
+    assert 'If-None-Match' not in sent_headers[0]
+    assert sent_headers[1]['If-None-Match'] == '"v1"'
+
+def test_repo_listing_pages_follow_the_link_header(monkeypatch):
+    import http_client
+
+    def fake_get(url, headers=None, params=None):
+        page = params['page']
+        link = f'<{url}?page=2>; rel="next", <{url}?page=3>; rel="last"' if page == 1 else None
+        return FakeListingResponse(200, [{'name': f'repo{page}'}], {'Link': link} if link else {})
+
+    monkeypatch.setattr(http_client, 'get', fake_get)
+    monkeypatch.setattr(github_analysis, 'listing_cache', None)
+    assert [repo['name'] for repo in github_analysis.get_all_user_repos('user')] == ['repo1', 'repo2', 'repo3']
+
+def test_dedup_reads_in_parallel_and_keeps_first_copy(monkeypatch, tmp_path):
+    shared = 'def shared():\n    return 42\n' * 40
+    repos = [
+        ('user', {'name': name, 'html_url': f'https://github.com/user/{name}'})
+        for name in ('slow', 'fast')
+    ]
+    events = []
+
+    def fake_clone(repo_url, local_path, max_bytes=None, **kwargs):
+        if repo_url.endswith('/slow'):
+            time.sleep(0.3)
+        os.makedirs(local_path)
+        with open(os.path.join(local_path, 'util.py'), 'w') as f:
+            f.write(shared)
+        events.append(('cloned', os.path.basename(local_path)))
+        return local_path
+
+    read = github_analysis.iter_code_sections
+
+    def recording_read(repo_path, **kwargs):
+        events.append(('read', os.path.basename(repo_path)))
+        return read(repo_path, **kwargs)
+
+    prompts = {}
+
+    def fake_summarize(chunks, repo_name, question, api_params):
+        prompts[repo_name] = "".join(chunks)
+        return f"summary of {repo_name}"
+
+    monkeypatch.setattr(github_analysis, 'collect_repos', lambda links: repos)
+    monkeypatch.setattr(github_analysis, 'clone_github_repo', fake_clone)
+    monkeypatch.setattr(github_analysis, 'iter_code_sections', recording_read)
+    monkeypatch.setattr(github_analysis, 'summarize_chunks', fake_summarize)
+    monkeypatch.setattr(github_analysis, 'summary_cache', None)
+    monkeypatch.setattr(github_analysis, 'static_analysis_enabled', False)
+    monkeypatch.setattr(github_analysis, 'shared_checkouts', SharedCheckouts(str(tmp_path)))
+    monkeypatch.setattr(github_analysis, 'dedup_enabled', True)
+    monkeypatch.setattr(github_analysis, 'dedup_mode', 'reference')
+    monkeypatch.setattr(github_analysis, 'dedup_min_bytes', 0)
+    monkeypatch.setattr(github_analysis, 'persistent_file_hashes', None)
+
+    results = github_analysis.analyze_github_repos(['https://github.com/user'], {'temperature': 0})
+    assert len(results) == 2
+    # The fast repository was read while the slow one was still cloning
+    assert events.index(('read', 'fast')) < events.index(('cloned', 'slow'))
+    # ...but the first repository in selection order still sends the shared file
+    assert 'return 42' in prompts['slow']
+    assert '[Duplicate of slow/util.py; content omitted]' in prompts['fast']
@@ -0,0 +1,75 @@
+import pytest
+import requests
+
+import http_client
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def close(self):
+        pass
+
+@pytest.fixture
+def transport(monkeypatch):
+    """
+    Replace the network and the clock: queued responses (or exceptions) are
+    returned in order, and sleeps are recorded instead of taken.
+    """
+    state = {'responses': [], 'calls': 0, 'sleeps': []}
+
+    def fake_request(method, url, **kwargs):
+        state['calls'] += 1
+        outcome = state['responses'].pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(http_client._session, 'request', fake_request)
+    monkeypatch.setattr(http_client.time, 'sleep', state['sleeps'].append)
+    monkeypatch.setattr(http_client.random, 'uniform', lambda low, high: 0.0)
+    monkeypatch.setattr(http_client, '_host_limits', {})
+    monkeypatch.setattr(http_client, 'max_retries', 3)
+    monkeypatch.setattr(http_client, 'backoff_factor', 1.0)
+    monkeypatch.setattr(http_client, 'max_backoff', 60)
+    monkeypatch.setattr(http_client, 'max_rate_limit_wait', 300)
+    return state
+
+def test_server_errors_are_retried_with_exponential_backoff(transport):
+    transport['responses'] = [FakeResponse(503), FakeResponse(502), FakeResponse(200)]
+    assert http_client.get('https://api.example.com/x').status_code == 200
+    assert transport['sleeps'] == [1.0, 2.0]
+
+def test_retry_after_is_honoured(transport):
+    transport['responses'] = [FakeResponse(429, {'Retry-After': '7'}), FakeResponse(200)]
+    assert http_client.get('https://api.example.com/x').status_code == 200
+    assert transport['sleeps'] == [7.0]
+
+def test_last_response_is_returned_once_retries_run_out(transport):
+    transport['responses'] = [FakeResponse(500) for _ in range(4)]
+    assert http_client.get('https://api.example.com/x').status_code == 500
+    assert transport['calls'] == 4
+    assert transport['sleeps'] == [1.0, 2.0, 4.0]
+
+def test_client_errors_are_not_retried(transport):
+    transport['responses'] = [FakeResponse(404)]
+    assert http_client.get('https://api.example.com/x').status_code == 404
+    assert transport['sleeps'] == []
+
+def test_connection_errors_are_retried_then_raised(transport):
+    transport['responses'] = [requests.ConnectionError('reset'), FakeResponse(200)]
+    assert http_client.get('https://api.example.com/x').status_code == 200
+    transport['responses'] = [requests.ConnectionError('reset') for _ in range(4)]
+    with pytest.raises(requests.ConnectionError):
+        http_client.get('https://api.example.com/x')
+
+def test_exhausted_github_quota_blocks_the_host(transport):
+    reset_at = http_client.time.time() + 3600
+    exhausted = {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': str(reset_at)}
+    transport['responses'] = [FakeResponse(403, exhausted)]
+    # The quota resets later than max_rate_limit_wait: no point waiting for it
+    assert http_client.get('https://api.github.com/users/x').status_code == 403
+    with pytest.raises(http_client.RateLimitExceeded):
+        http_client.get('https://api.github.com/users/y')
+    assert transport['calls'] == 1
@@ -0,0 +1,34 @@
+import pytest
+
+from job_server import parse_api_params, resolve_upload
+
+def test_parse_api_params_converts_allowed_keys():
+    assert parse_api_params({'temperature': '0.2', 'max_tokens': '800', 'bypass_cache': 'true'}) == {
+        'temperature': 0.2, 'max_tokens': 800, 'bypass_cache': True,
+    }
+
+@pytest.mark.parametrize('values', [
+    {'temperature': 'abc'},
+    {'temperature': 'nan'},
+    {'temperature': 3},
+    {'max_tokens': '1.5'},
+    {'max_tokens': True},
+    {'bypass_cache': 'yes'},
+    {'model': 'gpt-4'},
+])
+def test_parse_api_params_rejects_bad_input(values):
+    with pytest.raises(ValueError):
+        parse_api_params(values)
+
+def test_resolve_upload_stays_inside_the_upload_dir(tmp_path):
+    upload_dir = tmp_path / 'uploads'
+    upload_dir.mkdir()
+    (upload_dir / 'cv.pdf').write_bytes(b'%PDF')
+    (tmp_path / 'secret.pdf').write_bytes(b'%PDF')
+    (upload_dir / 'link.pdf').symlink_to(tmp_path / 'secret.pdf')
+
+    assert resolve_upload(str(upload_dir), 'cv.pdf') == str((upload_dir / 'cv.pdf').resolve())
+    assert resolve_upload(str(upload_dir), '../secret.pdf') is None
+    assert resolve_upload(str(upload_dir), str(tmp_path / 'secret.pdf')) is None
+    assert resolve_upload(str(upload_dir), 'link.pdf') is None
+    assert resolve_upload(str(upload_dir), 'missing.pdf') is None
@@ -0,0 +1,48 @@
+from job_store import JobStore, QUEUED, RUNNING, DONE, FAILED
+
+def test_jobs_are_claimed_oldest_first_and_finished(tmp_path):
+    store = JobStore(str(tmp_path / 'jobs.sqlite3'))
+    first = store.submit('/cv/a.pdf', {'temperature': 0})
+    second = store.submit('/cv/b.pdf', {'temperature': 0})
+
+    job = store.claim_next(worker_pid=101)
+    assert job['id'] == first and job['api_params'] == {'temperature': 0}
+    assert store.get(first)['status'] == RUNNING and store.get(first)['worker_pid'] == 101
+    store.add_event(first, 'cv', {'summary': 'ok'})
+    store.finish(first, 'report')
+    assert store.get(first)['status'] == DONE
+    assert store.events_since(first) == [{'seq': 1, 'event': 'cv', 'data': {'summary': 'ok'}}]
+
+    assert store.claim_next(worker_pid=101)['id'] == second
+    store.fail(second, 'boom')
+    assert store.claim_next() is None
+    assert store.counts() == {DONE: 1, FAILED: 1}
+
+def test_requeue_only_touches_the_dead_workers_jobs(tmp_path):
+    store = JobStore(str(tmp_path / 'jobs.sqlite3'))
+    dead_job = store.submit('/cv/a.pdf', {})
+    live_job = store.submit('/cv/b.pdf', {})
+    store.claim_next(worker_pid=101)
+    store.claim_next(worker_pid=202)
+
+    assert store.requeue_interrupted(max_attempts=3, worker_pid=101) == 1
+    assert store.get(dead_job)['status'] == QUEUED and store.get(dead_job)['worker_pid'] is None
+    assert store.get(live_job)['status'] == RUNNING
+
+def test_requeue_fails_jobs_out_of_attempts(tmp_path):
+    store = JobStore(str(tmp_path / 'jobs.sqlite3'))
+    job_id = store.submit('/cv/a.pdf', {})
+    for attempt in range(2):
+        store.claim_next(worker_pid=101)
+        assert store.requeue_interrupted(max_attempts=2) == (1 if attempt == 0 else 0)
+    job = store.get(job_id)
+    assert job['status'] == FAILED and job['attempts'] == 2
+    assert job['error'] == 'Interrupted too many times'
+
+def test_jobs_survive_a_restart(tmp_path):
+    path = str(tmp_path / 'jobs.sqlite3')
+    job_id = JobStore(path).submit('/cv/a.pdf', {})
+    JobStore(path).claim_next(worker_pid=101)
+    restarted = JobStore(path)
+    assert restarted.requeue_interrupted() == 1
+    assert restarted.claim_next(worker_pid=303)['id'] == job_id
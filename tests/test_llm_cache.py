@@ -0,0 +1,50 @@
+import pytest
+
+import llm_cache
+import openai_interaction
+from llm_cache import LLMCache
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, 'time', lambda: now[0])
+    return now
+
+def test_make_key_ignores_key_order():
+    assert LLMCache.make_key({'model': 'm', 'n': 1}) == LLMCache.make_key({'n': 1, 'model': 'm'})
+    assert LLMCache.make_key({'model': 'm', 'n': 1}) != LLMCache.make_key({'model': 'm', 'n': 2})
+
+def test_entries_expire_after_ttl(tmp_path, clock):
+    cache = LLMCache(str(tmp_path / 'llm.sqlite3'), ttl_seconds=60)
+    cache.set('key', 'value')
+    clock[0] += 59
+    assert cache.get('key') == 'value'
+    clock[0] += 2
+    assert cache.get('key') is None
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    cache = LLMCache(str(tmp_path / 'llm.sqlite3'), max_size_mb=30 / (1024 * 1024))  # 30 bytes
+    for key in ('a', 'b', 'c'):
+        clock[0] += 1
+        cache.set(key, key * 10)
+    clock[0] += 1
+    assert cache.get('a') == 'a' * 10
+    clock[0] += 1
+    cache.set('d', 'd' * 10)
+    assert [cache.get(key) is not None for key in ('a', 'b', 'c', 'd')] == [True, False, True, True]
+
+@pytest.mark.parametrize('api_params, bypass_when_sampling, allowed', [
+    ({'temperature': 0}, False, True),
+    ({'temperature': 0.7}, False, True),
+    ({'temperature': 0.7}, True, False),
+    ({'temperature': 0}, True, True),
+    ({'temperature': 0, 'bypass_cache': True}, False, False),
+    ({}, True, True),
+])
+def test_cache_allowed(monkeypatch, api_params, bypass_when_sampling, allowed):
+    monkeypatch.setattr(openai_interaction, 'llm_cache_config', {'bypass_when_sampling': bypass_when_sampling})
+    assert openai_interaction.cache_allowed(api_params) is allowed
+
+def test_cache_allowed_for_default_sampling_parameters(monkeypatch):
+    monkeypatch.setattr(openai_interaction, 'llm_cache_config', {})
+    assert openai_interaction.cache_allowed({'temperature': 0.7, 'max_tokens': 1500, 'n': 1})
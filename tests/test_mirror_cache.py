@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+import mirror_cache
+from mirror_cache import MirrorCache
+
+git = pytest.importorskip('git')
+
+def _make_repo(path, size):
+    repo = git.Repo.init(path)
+    with open(os.path.join(path, 'data.bin'), 'wb') as f:
+        f.write(os.urandom(size))
+    repo.index.add(['data.bin'])
+    repo.index.commit('initial', author=git.Actor('a', 'a@example.com'), committer=git.Actor('a', 'a@example.com'))
+    return 'file://' + str(path)
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = MirrorCache(str(tmp_path / 'mirrors'), max_bytes=300 * 1024)
+    # file:// URLs have no owner/repo; name mirrors after the source directory
+    monkeypatch.setattr(cache, 'mirror_path', lambda url: os.path.join(cache.root, 'owner', os.path.basename(url) + '.git'))
+    return cache
+
+def test_checkout_records_the_mirror_size(cache, tmp_path):
+    url = _make_repo(tmp_path / 'first', 100 * 1024)
+    assert cache.checkout(url, str(tmp_path / 'checkout')) == str(tmp_path / 'checkout')
+    assert os.path.isfile(tmp_path / 'checkout' / 'data.bin')
+    mirror_path = cache.mirror_path(url)
+    with open(mirror_path + '.size') as f:
+        assert int(f.read()) == mirror_cache.directory_size(mirror_path)
+
+def test_eviction_reads_recorded_sizes_and_removes_side_files(cache, tmp_path, monkeypatch):
+    first = _make_repo(tmp_path / 'first', 200 * 1024)
+    second = _make_repo(tmp_path / 'second', 200 * 1024)
+    cache.update(first)
+
+    measured = []
+    directory_size = mirror_cache.directory_size
+    monkeypatch.setattr(mirror_cache, 'directory_size', lambda path: measured.append(path) or directory_size(path))
+    cache.update(second)
+
+    # Only the new mirror was measured; the first one's size came from its .size file
+    assert all(path.startswith(cache.mirror_path(second)) for path in measured)
+    first_mirror = cache.mirror_path(first)
+    assert not os.path.exists(first_mirror)
+    assert not os.path.exists(first_mirror + '.size')
+    assert not os.path.exists(first_mirror + '.lock')
+    assert os.path.isdir(cache.mirror_path(second))
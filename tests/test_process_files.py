@@ -0,0 +1,85 @@
+import os
+import time
+import threading
+
+import pytest
+
+from file_dedup import FileDedupStore
+from process_files import iter_code_files, iter_code_sections, resolve_duplicates
+
+def _write_repo(root, files):
+    root.mkdir()
+    for name, content in files.items():
+        (root / name).write_text(content)
+    return str(root)
+
+def test_iter_code_files_stops_at_budget(tmp_path):
+    repo = _write_repo(tmp_path / 'repo', {'big.py': 'x = 1\n' * 20, 'small.py': 'y = 2\n'})
+    sections = list(iter_code_files(repo, max_chars=60))
+    assert len(sections) == 1
+    assert sections[0].startswith('\n\n### File: big.py\n')
+    assert len(sections[0]) == 60
+
+def test_iter_code_sections_fits_whole_files_within_budget(tmp_path):
+    repo = _write_repo(tmp_path / 'repo', {'big.py': 'x = 1\n' * 20, 'small.py': 'y = 2\n'})
+    sections = [section for section, _, _, _ in iter_code_sections(repo, max_chars=1000)]
+    assert [section.split('\n')[2] for section in sections] == ['### File: big.py', '### File: small.py']
+    assert sum(len(section) for section in sections) <= 1000
+    assert list(iter_code_sections(repo, max_chars=0)) == []
+
+def _resolve(repo_path, dedup, owner, dedup_mode='reference', max_chars=None):
+    sections = list(iter_code_sections(repo_path, max_chars=max_chars, dedup=dedup))
+    return resolve_duplicates(sections, dedup, owner, os.path.basename(repo_path), dedup_mode)
+
+def test_resolve_duplicates_records_only_complete_files(tmp_path):
+    repo = _write_repo(tmp_path / 'repo', {'big.py': 'x = 1\n' * 20, 'small.py': 'y = 2\n'})
+    dedup = FileDedupStore()
+    assert [record for _, record, _ in _resolve(repo, dedup, 'repo', max_chars=60)] == [None]
+    assert [record[1] for _, record, _ in _resolve(repo, dedup, 'repo')] == ['repo/big.py', 'repo/small.py']
+
+def test_resolve_duplicates_without_store_keeps_sections():
+    sections = [('\n\n### File: a.py\nx\n', 'a.py', None, True)]
+    assert resolve_duplicates(sections, None, 'repo', 'repo') == [('\n\n### File: a.py\nx\n', None, None)]
+
+@pytest.mark.parametrize('dedup_mode', ['reference', 'skip'])
+def test_resolve_duplicates_replaces_recorded_files(tmp_path, dedup_mode):
+    shared = 'def shared():\n    return 42\n'
+    first = _write_repo(tmp_path / 'first', {'util.py': shared})
+    second = _write_repo(tmp_path / 'second', {'util.py': shared, 'main.py': 'print(1)\n'})
+    dedup = FileDedupStore()
+
+    first_results = _resolve(first, dedup, 'first', dedup_mode)
+    # Looked up but not yet recorded: the second repository still sends its copy
+    assert [duplicate_of for _, _, duplicate_of in _resolve(second, dedup, 'second')] == [None, None]
+
+    dedup.record([record for _, record, _ in first_results if record], 'first')
+    sections = [section for section, _, _ in _resolve(second, dedup, 'second', dedup_mode) if section]
+    assert any('print(1)' in section for section in sections)
+    assert not any('return 42' in section for section in sections)
+    if dedup_mode == 'reference':
+        assert any('[Duplicate of first/util.py; content omitted]' in section for section in sections)
+    else:
+        assert len(sections) == 1
+    # A repository is never deduplicated against itself
+    assert ''.join(section for section, _, _ in _resolve(first, dedup, 'first')).count('return 42') == 1
+
+def test_dedup_turns_follow_selection_order():
+    dedup = FileDedupStore()
+    dedup.set_order(['first', 'second'])
+    resolved = []
+
+    def resolve(owner, digest):
+        dedup.wait_turn(owner)
+        if dedup.lookup(digest, owner) is None:
+            dedup.record([(digest, f"{owner}/util.py")], owner)
+            resolved.append(owner)
+        dedup.release(owner)
+
+    # The later repository finishes reading first, but must not claim the file
+    second = threading.Thread(target=resolve, args=('second', 'digest'))
+    second.start()
+    time.sleep(0.1)
+    assert resolved == []
+    resolve('first', 'digest')
+    second.join(5)
+    assert resolved == ['first']